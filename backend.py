@@ -1,47 +1,336 @@
 # backend.py
 import threading
 import time
-import random
-from pynput import mouse, keyboard
+import traceback
+
+from metrics import ExecutorMetrics
+from outputs import create_backend
+from program import compile_sequence
+from timing import DEFAULT_SPIN_THRESHOLD_MS, DeadlineScheduler, TimingProfile, load_numpy
+
+BURST_TICK_S = 0.001
+MAX_BURST_S = 0.05  # Owed actions older than this are dropped rather than fired in one batch
+STOP_TIMEOUT_S = 1.0
+HOT_SWAP_FIELDS = ('delay_seconds', 'stop_count', 'action_sequence', 'click_pos', 'random_delay_ms', 'timing', 'gate',
+                   'macro')
 
 class ActionExecutor(threading.Thread):
-    def __init__(self, delay_seconds, stop_count, action_sequence, click_pos=None, random_delay_ms=0):
+    """Runs an action sequence at a fixed rate until stopped or `stop_count` is reached.
+
+    In burst mode the loop wakes once per BURST_TICK_S and injects every action
+    owed since the start in one batch (a single click(count=n) for plain clicks),
+    so rates far beyond what one Python iteration per action allows keep an
+    exact long-run average. Random delay does not apply in burst mode.
+
+    Random delay comes from `timing` (a TimingProfile); by default a uniform
+    profile over +/- random_delay_ms.
+
+    An optional `gate` (e.g. a screen.ConditionMonitor) is checked with one
+    is_open() call per slot; while it is closed, slots pass without acting.
+
+    With a `macro` (a macrofile.MacroPlayback) a run replays its records instead,
+    each at its recorded time through the same interruptible scheduler wait;
+    stop_count then limits the number of records, and rate, jitter and gate do
+    not apply. A macro swapped in by update() takes effect with the next run.
+
+    If a run raises, the exception is kept in `error` and the run ends as if it
+    had finished (on_finished is called); the thread survives it.
+
+    With persistent=True the thread outlives its runs: between runs it waits on
+    a condition, start_run()/stop_run() take effect within a millisecond, and
+    update() swaps rate, jitter, target or position into the running loop.
+    """
+    def __init__(self, delay_seconds, stop_count, action_sequence, click_pos=None, random_delay_ms=0,
+                 precision="hybrid", catch_up="skip", backend=None, on_finished=None, burst=False,
+                 timing=None, gate=None, persistent=False, macro=None, spin_threshold_ms=DEFAULT_SPIN_THRESHOLD_MS):
         super().__init__()
-        self.base_delay = delay_seconds
-        self.random_delay_s = random_delay_ms / 1000.0
-        self.stop_count = stop_count
-        self.action_sequence = action_sequence
-        self.click_pos = click_pos
+        self.backend = backend if backend is not None else create_backend()
+        self.precision = precision
+        self.catch_up = catch_up
+        self.spin_threshold_ms = spin_threshold_ms
+        self.on_finished = on_finished
+        self.persistent = persistent
         self.running = False
         self.actions_done = 0
-        self.mouse = mouse.Controller()
-        self.keyboard = keyboard.Controller()
+        self.metrics = ExecutorMetrics()
+        self.error = None  # The exception that ended the last run, if any
+        self._condition = threading.Condition()
+        self._interrupt = threading.Event()  # Wakes the loop for a stop or a hot swap
+        self._pending = {}
+        self._in_run = False
+        self._run_requested = True  # start() begins the first run
+        self._shutdown = False
+        self._uncollected = False
+        self._configure(dict(delay_seconds=delay_seconds, stop_count=stop_count, action_sequence=action_sequence,
+                             click_pos=click_pos, random_delay_ms=random_delay_ms, timing=timing, gate=gate,
+                             macro=macro),
+                        burst=burst)
         self.daemon = True
+        # Imported now rather than by a TimingProfile that a hot swap builds inside the running loop
+        load_numpy()
+
+    @property
+    def active(self):
+        """True while a run is in progress."""
+        return self._in_run or self._run_requested
+
+    @property
+    def missed_deadlines(self):
+        return self.scheduler.missed
+
+    def _configure(self, changes, burst=None):
+        if burst is not None:
+            self.burst = burst
+        if 'random_delay_ms' in changes:
+            self.random_delay_s = changes['random_delay_ms'] / 1000.0
+            if changes.get('timing') is None:
+                self.timing = TimingProfile(self.random_delay_s)
+        if changes.get('timing') is not None:
+            self.timing = changes['timing']
+        if 'stop_count' in changes:
+            self.stop_count = changes['stop_count']
+        if 'gate' in changes:
+            self.gate = changes['gate']
+        if 'macro' in changes:
+            self.macro = changes['macro']
+        if 'action_sequence' in changes:
+            self.action_sequence = changes['action_sequence']
+        if 'click_pos' in changes:
+            self.click_pos = changes['click_pos']
+        if 'action_sequence' in changes or 'click_pos' in changes:
+            self.program = compile_sequence(self.action_sequence, self.click_pos)
+            self.steps = self.program.bind(self.backend)
+        if 'delay_seconds' in changes:
+            self.base_delay = changes['delay_seconds']
+        if 'delay_seconds' in changes or burst is not None:
+            tick = max(self.base_delay, BURST_TICK_S) if self.burst else self.base_delay
+            if self._in_run:
+                self.scheduler.set_period(tick)
+            else:
+                self.scheduler = DeadlineScheduler(tick, precision=self.precision, catch_up=self.catch_up,
+                                                   spin_threshold_ms=self.spin_threshold_ms)
+
+    def start_run(self, burst=None, **changes):
+        """Starts a new run, optionally with changed parameters. Returns False if one is already running."""
+        with self._condition:
+            if self._in_run or self._run_requested:
+                return False
+            unknown = set(changes) - set(HOT_SWAP_FIELDS)
+            if unknown:
+                raise TypeError(f"Unknown executor parameters: {', '.join(sorted(unknown))}")
+            self._configure(changes, burst=burst)
+            self._run_requested = True
+            self._condition.notify_all()
+        return True
+
+    def update(self, **changes):
+        """Applies parameter changes; while running they are swapped in by the loop itself."""
+        unknown = set(changes) - set(HOT_SWAP_FIELDS)
+        if unknown:
+            raise TypeError(f"Unknown executor parameters: {', '.join(sorted(unknown))}")
+        with self._condition:
+            if self._in_run:
+                self._pending.update(changes)
+                self._interrupt.set()
+            else:
+                self._configure(changes)
+
+    def _apply_pending(self):
+        with self._condition:
+            changes, self._pending = self._pending, {}
+            if not self.running:
+                # A stop arrived with the changes; keep them for the next run
+                self._configure(changes)
+                return
+            self._interrupt.clear()
+        self._configure(changes)
 
     def run(self):
-        self.running = True
+        while True:
+            with self._condition:
+                while not self._run_requested and not self._shutdown:
+                    self._condition.wait()
+                if self._shutdown:
+                    break
+                self._run_requested = False
+                self._in_run = True
+                self.running = True
+                self.actions_done = 0
+                self.metrics = ExecutorMetrics()
+                self.error = None
+                self._interrupt.clear()
+            try:
+                if self.macro is not None:
+                    self._run_macro()
+                elif self.burst:
+                    self._run_burst()
+                else:
+                    self._run_paced()
+            except Exception as e:
+                # A failed run ends like a finished one; the thread stays parked for the next run
+                self.error = e
+                traceback.print_exc()
+            finally:
+                with self._condition:
+                    finished = self.running  # Still set only if the run ended on its own (or failed)
+                    self.running = False
+                    self._in_run = False
+                    self._uncollected = True
+                    self._condition.notify_all()
+            if finished and self.on_finished:
+                self.on_finished(self)
+            if not self.persistent:
+                break
+        self.running = False
+
+    def _run_paced(self):
+        gate = self.gate
+        next_offset = self.timing.next_ns
+        flush = self.backend.flush
+        metrics = self.metrics
+        clock = time.perf_counter_ns
+        interrupt = self._interrupt
+        scheduler = self.scheduler
+        scheduler.start()
         while self.running:
+            if self._pending:
+                # Checked every iteration, since a loop that is behind schedule never waits
+                self._apply_pending()
+                gate, next_offset = self.gate, self.timing.next_ns
             if self.stop_count > 0 and self.actions_done >= self.stop_count:
                 break
-            
-            for event in self.action_sequence:
-                if event['type'] == 'click':
-                    if self.click_pos:
-                        self.mouse.position = self.click_pos
-                    self.mouse.click(event['button'])
-                elif event['type'] == 'press':
-                    self.keyboard.press(event['key'])
-                elif event['type'] == 'release':
-                    self.keyboard.release(event['key'])
-            
+
+            if not scheduler.wait(interrupt):
+                continue
+            if gate is not None and not gate.is_open():
+                scheduler.advance(next_offset())
+                continue
+
+            started = clock()
+            for action, arg in self.steps:
+                action(arg)
+            flush()
+            metrics.record_action(started, clock())
+
             self.actions_done += 1
-            
-            # Calculate final delay with randomization
-            random_offset = random.uniform(-self.random_delay_s, self.random_delay_s)
-            final_delay = max(0, self.base_delay + random_offset)
-            time.sleep(final_delay)
-            
-        self.running = False
+
+            # Randomization shifts each deadline around the fixed grid, so it never drifts the mean rate
+            scheduler.advance(next_offset())
+            metrics.missed_deadlines = scheduler.missed
+
+    def _run_macro(self):
+        handlers = self.macro.bind(self.backend)
+        flush = self.backend.flush
+        metrics = self.metrics
+        clock = time.perf_counter_ns
+        interrupt = self._interrupt
+        scheduler = self.scheduler
+        scheduler.start()
+        origin = scheduler.grid_ns
+        for t_ns, opcode, code, x, y in self.macro.timeline():
+            while self.running:
+                if self._pending:
+                    # Only the stop count affects the macro being played
+                    self._apply_pending()
+                scheduler.deadline_ns = origin + t_ns
+                if scheduler.wait(interrupt):
+                    break
+            if not self.running or (self.stop_count > 0 and self.actions_done >= self.stop_count):
+                break
+
+            started = clock()
+            handlers[opcode](code, x, y)
+            flush()
+            metrics.record_action(started, clock())
+            self.actions_done += 1
+
+    def _run_burst(self):
+        backend = self.backend
+        metrics = self.metrics
+        clock = time.perf_counter_ns
+        interrupt = self._interrupt
+        gate = self.gate
+        single_click = self.program.single_click()
+        period_ns = max(1, int(self.base_delay * 1_000_000_000))
+        max_batch = max(1, int(MAX_BURST_S * 1_000_000_000) // period_ns)
+        origin = clock()
+        self.scheduler.start()
+        while self.running:
+            if self._pending:
+                # Checked every iteration, since a loop that is behind schedule never waits
+                self._apply_pending()
+                gate = self.gate
+                single_click = self.program.single_click()
+                period_ns = max(1, int(self.base_delay * 1_000_000_000))
+                max_batch = max(1, int(MAX_BURST_S * 1_000_000_000) // period_ns)
+                # Nothing is owed yet at the new rate
+                origin = clock() - (self.actions_done - 1) * period_ns
+            if self.stop_count > 0 and self.actions_done >= self.stop_count:
+                break
+
+            if not self.scheduler.wait(interrupt):
+                continue
+
+            # Everything owed since the origin, so the long-run average stays exact
+            started = clock()
+            due = (started - origin) // period_ns + 1 - self.actions_done
+            if gate is not None and not gate.is_open():
+                # Nothing is owed for the time the gate was closed
+                origin += max(0, due) * period_ns
+                self.scheduler.advance()
+                continue
+            if due > max_batch:
+                dropped = due - max_batch
+                origin += dropped * period_ns
+                metrics.missed_deadlines += dropped
+                due = max_batch
+            if self.stop_count > 0:
+                due = min(due, self.stop_count - self.actions_done)
+            if due > 0:
+                if single_click is not None:
+                    pos, button = single_click
+                    if pos is not None:
+                        backend.move(pos)
+                    backend.click(button, due)
+                else:
+                    steps = self.steps
+                    for _ in range(due):
+                        for action, arg in steps:
+                            action(arg)
+                backend.flush()
+                metrics.record_action(started, clock(), due)
+                self.actions_done += due
+            self.scheduler.advance()
 
     def stop(self):
-        self.running = False
\ No newline at end of file
+        """Ends the current run without waiting; a non-persistent executor's thread then exits."""
+        with self._condition:
+            self.running = False
+            self._run_requested = False
+            self._shutdown = self._shutdown or not self.persistent
+            self._interrupt.set()
+            self._condition.notify_all()
+
+    def stop_run(self, timeout=STOP_TIMEOUT_S):
+        """Ends the current run and returns its exact action count.
+
+        The count of a run is returned once; a second call (or a call after the
+        run was already collected) returns 0.
+        """
+        with self._condition:
+            self.running = False
+            self._run_requested = False
+            self._interrupt.set()
+            if self.is_alive():
+                self._condition.wait_for(lambda: not self._in_run, timeout)
+            if not self._uncollected:
+                return 0
+            self._uncollected = False
+            return self.actions_done
+
+    def shutdown(self):
+        with self._condition:
+            self.running = False
+            self._shutdown = True
+            self._interrupt.set()
+            self._condition.notify_all()
@@ -0,0 +1,155 @@
+# bench.py
+"""Measures what ActionExecutor actually delivers against the null output backend.
+
+Usage:
+    python bench.py --cps 1,10,100,1000 --random-ms 0,5 --lengths 1,4 --output bench.json
+    python bench.py --compare bench.json
+    python bench.py --probe pynput,xtest
+
+--probe skips the benchmark and instead runs an ActionExecutor tapping Shift
+through each named backend, listening for its events to come back: it reports
+injection-to-observation latency and dropped events (this needs a real display).
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+from backend import ActionExecutor
+from outputs import NullBackend
+from timing import DEFAULT_SPIN_THRESHOLD_MS
+
+def _parse_list(text, cast):
+    return [cast(part) for part in text.split(",") if part.strip()]
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Builds a sequence of `length` events: a click for length 1, otherwise key taps.
+def _make_sequence(length):
+    if length == 1:
+        return [{'type': 'click', 'button': 'left'}]
+    sequence = []
+    for i in range(length):
+        sequence.append({'type': 'press' if i % 2 == 0 else 'release', 'key': 'e'})
+    return sequence
+
+def run_case(cps, random_ms, length, duration, precision, catch_up, spin_ms=DEFAULT_SPIN_THRESHOLD_MS):
+    period = 1.0 / cps
+    stop_count = max(3, int(cps * duration))
+    backend = NullBackend()
+    executor = ActionExecutor(period, stop_count, _make_sequence(length), None, random_ms,
+                              precision=precision, catch_up=catch_up, backend=backend, spin_threshold_ms=spin_ms)
+    cpu_start = time.process_time()
+    executor.start()
+    executor.join()
+    cpu_time = time.process_time() - cpu_start
+
+    # The first event of every iteration marks when that action was injected.
+    stamps = [event[0] for event in backend.events[::length]]
+    intervals = [(b - a) / 1e9 for a, b in zip(stamps, stamps[1:])]
+    elapsed = (stamps[-1] - stamps[0]) / 1e9 if len(stamps) > 1 else 0.0
+    jitter = sorted(abs(i - period) * 1000.0 for i in intervals)
+    return {
+        "target_cps": cps,
+        "random_ms": random_ms,
+        "sequence_length": length,
+        "actions": executor.actions_done,
+        "achieved_cps": (len(stamps) - 1) / elapsed if elapsed > 0 else 0.0,
+        "jitter_ms": {
+            "p50": _percentile(jitter, 50),
+            "p95": _percentile(jitter, 95),
+            "p99": _percentile(jitter, 99),
+        },
+        "missed_deadlines": executor.missed_deadlines,
+        "cpu_us_per_action": cpu_time / max(1, executor.actions_done) * 1e6,
+    }
+
+def _case_key(case):
+    return (case["target_cps"], case["random_ms"], case["sequence_length"])
+
+def compare(previous, current):
+    old_cases = {_case_key(case): case for case in previous["cases"]}
+    print(f"{'cps':>6} {'rand':>5} {'len':>4} {'achieved':>18} {'p99 ms':>16} {'cpu us':>16}")
+    for case in current["cases"]:
+        old = old_cases.get(_case_key(case))
+        if old is None:
+            continue
+        print(f"{case['target_cps']:>6g} {case['random_ms']:>5} {case['sequence_length']:>4} "
+              f"{old['achieved_cps']:>8.1f}->{case['achieved_cps']:<8.1f} "
+              f"{old['jitter_ms']['p99']:>7.3f}->{case['jitter_ms']['p99']:<7.3f} "
+              f"{old['cpu_us_per_action']:>7.1f}->{case['cpu_us_per_action']:<7.1f}")
+
+def run_probes(names, count, output=None):
+    from loopback import probe_backend
+    reports = []
+    for name in names:
+        report = probe_backend(name, count=count)
+        reports.append(report)
+        latency = report["latency"]
+        print(f"{name}: {report['observed']}/{report['injected']} observed, {report['dropped']} dropped, "
+              f"{report['flagged_injected']} flagged injected, latency p50 {latency['p50_ms']:.3f} ms, "
+              f"p99 {latency['p99_ms']:.3f} ms")
+    if output:
+        with open(output, "w") as f:
+            json.dump({"revision": _git_revision(), "platform": platform.platform(), "probes": reports}, f, indent=2)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ActionExecutor rate, jitter and CPU cost.")
+    parser.add_argument("--cps", default="1,10,50,100,200,500,1000", help="Comma-separated CPS targets.")
+    parser.add_argument("--random-ms", default="0", help="Comma-separated random delay settings (ms).")
+    parser.add_argument("--lengths", default="1", help="Comma-separated sequence lengths.")
+    parser.add_argument("--duration", type=float, default=2.0, help="Seconds per case.")
+    parser.add_argument("--precision", default="hybrid")
+    parser.add_argument("--spin-ms", type=float, default=DEFAULT_SPIN_THRESHOLD_MS,
+                        help="How long before each deadline hybrid precision starts spinning.")
+    parser.add_argument("--catch-up", default="skip")
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    parser.add_argument("--compare", help="Compare against a previous JSON result.")
+    parser.add_argument("--probe", help="Comma-separated output backends to loopback-probe with an executor run instead.")
+    parser.add_argument("--probe-count", type=int, default=200, help="Key taps the executor injects per probed backend.")
+    args = parser.parse_args(argv)
+
+    if args.probe:
+        run_probes(_parse_list(args.probe, str.strip), args.probe_count, args.output)
+        return
+
+    results = {
+        "revision": _git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "precision": args.precision,
+        "catch_up": args.catch_up,
+        "spin_ms": args.spin_ms,
+        "cases": [],
+    }
+    for cps in _parse_list(args.cps, float):
+        for random_ms in _parse_list(args.random_ms, int):
+            for length in _parse_list(args.lengths, int):
+                case = run_case(cps, random_ms, length, args.duration, args.precision, args.catch_up, args.spin_ms)
+                results["cases"].append(case)
+                print(f"cps={cps:g} random={random_ms}ms len={length}: "
+                      f"{case['achieved_cps']:.1f} cps, p99 jitter {case['jitter_ms']['p99']:.3f} ms, "
+                      f"{case['missed_deadlines']} missed, {case['cpu_us_per_action']:.1f} us cpu/action")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+if __name__ == "__main__":
+    main()
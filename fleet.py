@@ -0,0 +1,231 @@
+# fleet.py
+"""Drives many X displays in parallel, one worker process per display.
+
+Usage:
+    python main.py --fleet fleet.json
+    python fleet.py fleet.json --duration 60
+
+The config is JSON:
+    {
+        "backend": "xtest",
+        "xvfb": false,
+        "report_interval": 1.0,
+        "workers": [
+            {"display": ":1", "profile": "farm"},
+            {"display": ":2", "settings": {"target": "Left", "delay": 0.01}, "cpu": 3}
+        ]
+    }
+Each worker takes "settings" or "profile" like a headless config, and may
+override "backend", "precision", "catch_up" and "spin_threshold_ms" (all
+taken from the top level otherwise). With "xvfb": true the supervisor starts
+an Xvfb server for every display (with "xvfb_args", default one 1280x720x24
+screen) and stops it afterwards.
+
+Workers are separate processes (started with "spawn", so each imports pynput
+or python-xlib against its own DISPLAY) and so do not share a GIL. On Linux
+each is pinned to one CPU, "cpu" or the next available one, with
+os.sched_setaffinity. Every report_interval each worker sends a metrics
+snapshot back over its pipe; the supervisor prints per-worker and total rates.
+"""
+import argparse
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import shutil
+import subprocess
+import time
+
+DEFAULT_XVFB_ARGS = ["-screen", "0", "1280x720x24", "-nolisten", "tcp"]
+XVFB_START_TIMEOUT_S = 5.0
+STOP_TIMEOUT_S = 2.0
+
+def available_cpus():
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+# Runs in the worker process: one ActionExecutor on one display, reporting over `conn`.
+def worker_main(spec, conn):
+    os.environ['DISPLAY'] = spec['display']
+    cpu = spec.get('cpu')
+    if cpu is not None and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, {cpu})
+    # Imported only now, so pynput and python-xlib connect to this worker's display
+    from backend import ActionExecutor
+    from headless import executor_options, resolve_settings
+    from outputs import create_backend
+    from profiles import build_action_sequence, build_click_target, build_timing
+
+    settings = resolve_settings(spec)
+    name = spec.get('backend', "pynput")
+    backend = create_backend(name, display_name=spec['display']) if name == "xtest" else create_backend(name)
+    executor = ActionExecutor(settings['delay'], settings['stop_count'], build_action_sequence(settings),
+                              build_click_target(settings), settings.get('random_ms', 0), backend=backend,
+                              burst=settings.get('burst', False), timing=build_timing(settings),
+                              **executor_options(spec))
+    interval = spec.get('report_interval', 1.0)
+
+    def report(done=False):
+        metrics = executor.metrics
+        return {
+            'display': spec['display'],
+            'pid': os.getpid(),
+            'cpu': cpu,
+            'actions': executor.actions_done,
+            'actual_cps': metrics.actual_cps,
+            'p99_ms': metrics.intervals.percentile(99),
+            'missed_deadlines': metrics.missed_deadlines,
+            'done': done,
+        }
+
+    executor.start()
+    try:
+        while executor.is_alive():
+            if conn.poll(interval):
+                if conn.recv() == "stop":
+                    break
+            else:
+                conn.send(report())
+    except (EOFError, KeyboardInterrupt):
+        pass  # The supervisor went away; stop quietly
+    finally:
+        executor.stop()
+        executor.join(STOP_TIMEOUT_S)
+        backend.close()
+        try:
+            conn.send(report(done=True))
+        except (BrokenPipeError, OSError):
+            pass
+
+class FleetSupervisor:
+    """Starts one worker process (and optionally one Xvfb) per display and collects their reports."""
+    def __init__(self, config):
+        self.config = config
+        self.context = multiprocessing.get_context("spawn")
+        self.workers = []  # (spec, process, connection)
+        self.xvfb = []
+        self.reports = {}
+
+    def _worker_specs(self):
+        cpus = available_cpus()
+        specs = []
+        for i, worker in enumerate(self.config['workers']):
+            spec = dict(worker)
+            spec.setdefault('backend', self.config.get('backend', "pynput"))
+            spec.setdefault('report_interval', self.config.get('report_interval', 1.0))
+            for option in ('precision', 'catch_up', 'spin_threshold_ms'):
+                if option in self.config:
+                    spec.setdefault(option, self.config[option])
+            if self.config.get('pin', True):
+                spec.setdefault('cpu', cpus[i % len(cpus)])
+            specs.append(spec)
+        return specs
+
+    def _start_xvfb(self, display):
+        if shutil.which("Xvfb") is None:
+            raise RuntimeError("xvfb is enabled but Xvfb is not installed")
+        args = self.config.get('xvfb_args', DEFAULT_XVFB_ARGS)
+        process = subprocess.Popen(["Xvfb", display, *args], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.xvfb.append(process)
+        socket_path = f"/tmp/.X11-unix/X{display.lstrip(':').split('.')[0]}"
+        deadline = time.monotonic() + XVFB_START_TIMEOUT_S
+        while not os.path.exists(socket_path):
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError(f"Xvfb failed to start on {display}")
+            time.sleep(0.05)
+
+    def start(self):
+        for spec in self._worker_specs():
+            if self.config.get('xvfb'):
+                self._start_xvfb(spec['display'])
+            parent_conn, child_conn = self.context.Pipe()
+            process = self.context.Process(target=worker_main, args=(spec, child_conn),
+                                           name=f"autoclicker-{spec['display']}", daemon=True)
+            process.start()
+            child_conn.close()
+            self.workers.append((spec, process, parent_conn))
+
+    def poll(self, timeout):
+        """Collects every report that arrives within `timeout`; returns False once all workers are done."""
+        deadline = time.monotonic() + timeout
+        while True:
+            connections = {conn: spec['display'] for spec, _, conn in self.workers
+                           if not self.reports.get(spec['display'], {}).get('done')}
+            remaining = deadline - time.monotonic()
+            if not connections or remaining <= 0:
+                return bool(connections)
+            for conn in multiprocessing.connection.wait(list(connections), remaining):
+                display = connections[conn]
+                try:
+                    self.reports[display] = conn.recv()
+                except EOFError:
+                    # The worker died without a final report; keep its last counts
+                    report = self.reports.setdefault(display, {})
+                    report.update(display=display, done=True, failed=True)
+
+    def latest(self):
+        return [self.reports.get(spec['display'], {}) for spec, _, _ in self.workers]
+
+    def totals(self):
+        reports = self.latest()
+        return {
+            'workers': len(self.workers),
+            'failed': sum(1 for r in reports if r.get('failed')),
+            'actions': sum(r.get('actions', 0) for r in reports),
+            'actual_cps': sum(r.get('actual_cps', 0.0) for r in reports),
+            'missed_deadlines': sum(r.get('missed_deadlines', 0) for r in reports),
+        }
+
+    def stop(self):
+        for _, process, conn in self.workers:
+            if process.is_alive():
+                try:
+                    conn.send("stop")
+                except (BrokenPipeError, OSError):
+                    pass
+        deadline = time.monotonic() + STOP_TIMEOUT_S
+        self.poll(STOP_TIMEOUT_S)  # Final reports
+        for _, process, conn in self.workers:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+            conn.close()
+        for process in self.xvfb:
+            process.terminate()
+            process.wait()
+
+def run(config, duration=None):
+    supervisor = FleetSupervisor(config)
+    interval = config.get('report_interval', 1.0)
+    started = time.monotonic()
+    try:
+        supervisor.start()
+        while supervisor.poll(interval):
+            for report in supervisor.latest():
+                if report.get('failed'):
+                    print(f"{report['display']}: worker exited without a final report")
+                elif 'actions' in report:
+                    print(f"{report['display']} (cpu {report['cpu']}): {report['actions']} actions, "
+                          f"{report['actual_cps']:.1f} CPS, p99 {report['p99_ms']:.2f} ms")
+            totals = supervisor.totals()
+            print(f"total: {totals['actions']} actions, {totals['actual_cps']:.1f} CPS over {totals['workers']} workers")
+            if duration is not None and time.monotonic() - started >= duration:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        supervisor.stop()
+    return supervisor.totals()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run one autoclicker worker per X display.")
+    parser.add_argument("config", help="JSON fleet config file.")
+    parser.add_argument("--duration", type=float, help="Stop all workers after this many seconds.")
+    args = parser.parse_args(argv)
+    with open(args.config) as f:
+        config = json.load(f)
+    print(json.dumps(run(config, args.duration)))
+
+if __name__ == "__main__":
+    main()
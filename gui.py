@@ -1,84 +1,87 @@
 # gui.py
 import customtkinter as ctk
-import threading
+from tkinter import filedialog
+import os
+import queue
 import time
+import traceback
 from pynput import mouse, keyboard
 
 from backend import ActionExecutor
-from recorder import ActionRecorder
+from hotkeys import HotkeyIndex, HotkeyListener
+from inputs import get_hub
+from loopback import InjectionLedger, TaggedBackend
+from macrofile import MacroPlayback
+from outputs import create_backend
+from profiles import ProfileStore, build_action_sequence, build_click_target, build_timing
+from recorder import MACRO_EXTENSION, ActionRecorder, MacroRecorder
+from timelines import TimelineScheduler
+from metrics import export_snapshot
+from paths import load_points
 from utils import format_key, format_action_sequence, format_time
 
-class HotkeyListener(threading.Thread):
-    def __init__(self, app_instance):
-        super().__init__()
-        self.app = app_instance
-        self.pressed_keys = set()
-        self.listener = None
-        self.daemon = True
-
-    def run(self):
-        with keyboard.Listener(on_press=self.on_press, on_release=self.on_release) as listener:
-            self.listener = listener
-            listener.join()
-
-    def on_press(self, key):
-        self.pressed_keys.add(key)
-        
-        # Check for Toggle Hotkey
-        if sorted(list(map(str, self.pressed_keys))) == sorted(list(map(str, self.app.toggle_hotkey_action))):
-            self.app.toggle_action()
-        
-        # Check for Hold Hotkey
-        elif sorted(list(map(str, self.pressed_keys))) == sorted(list(map(str, self.app.hold_hotkey_action))):
-            self.app.start_action()
-
-    def on_release(self, key):
-        # If the released key is part of the hold hotkey, stop the action
-        if key in self.app.hold_hotkey_action:
-            self.app.stop_action()
-
-        try:
-            self.pressed_keys.remove(key)
-        except KeyError:
-            pass
-    
-    def stop(self):
-        if self.listener:
-            self.listener.stop()
-
 class Tooltip:
+    """Shows `text` (a string, or a callable returning one) while the pointer is over `widget`.
+
+    The popup is built on the first hover and then only hidden and shown again.
+    """
     def __init__(self, widget, text):
         self.widget = widget
         self.text = text
         self.tooltip_window = None
+        self.label = None
         self.widget.bind("<Enter>", self.show_tooltip)
         self.widget.bind("<Leave>", self.hide_tooltip)
 
+    def _build(self):
+        text = self.text() if callable(self.text) else self.text
+        self.tooltip_window = ctk.CTkToplevel(self.widget)
+        self.tooltip_window.wm_overrideredirect(True)
+        self.label = ctk.CTkLabel(self.tooltip_window, text=text, corner_radius=5, justify="left")
+        self.label.pack(ipadx=5, ipady=5)
+
     def show_tooltip(self, event=None):
-        if self.tooltip_window or not self.text:
+        if not self.text:
             return
+        if self.tooltip_window is None:
+            self._build()
         x, y, _, _ = self.widget.bbox("insert")
         x += self.widget.winfo_rootx() + 25
         y += self.widget.winfo_rooty() + 25
-        self.tooltip_window = ctk.CTkToplevel(self.widget)
-        self.tooltip_window.wm_overrideredirect(True)
         self.tooltip_window.wm_geometry(f"+{x}+{y}")
-        
+
         current_theme = ctk.get_appearance_mode()
         bg_color = "gray92" if current_theme == "Light" else "gray14"
         text_color = "gray14" if current_theme == "Light" else "gray92"
-        
-        label = ctk.CTkLabel(self.tooltip_window, text=self.text, corner_radius=5,
-                             fg_color=bg_color, text_color=text_color, 
-                             justify="left")
-        label.pack(ipadx=5, ipady=5)
+        self.label.configure(fg_color=bg_color, text_color=text_color)
+        self.tooltip_window.deiconify()
 
     def hide_tooltip(self, event=None):
-        if self.tooltip_window:
-            self.tooltip_window.destroy()
-        self.tooltip_window = None
+        if self.tooltip_window is not None:
+            self.tooltip_window.withdraw()
 
 class App(ctk.CTk):
+    MAX_CPS = 200
+    MAX_BURST_CPS = 5000
+    DISTRIBUTIONS = {"Uniform": "uniform", "Gaussian": "gaussian", "Log-normal": "lognormal"}
+    PATH_ORDERS = {"In Order": "sequence", "Random": "random", "Shortest Route": "route"}
+    COMMAND_POLL_MS = 10
+    # The executor parameters each setting feeds; settings not listed here apply from the next start
+    LIVE_PARAMS = {
+        'delay': ('delay_seconds',),
+        'stop_count': ('stop_count',),
+        'target': ('action_sequence',),
+        'custom_key_action': ('action_sequence',),
+        'text': ('action_sequence',),
+        'text_file': ('action_sequence',),
+        'click_pos': ('click_pos',),
+        'click_path': ('click_pos',),
+        'random_ms': ('random_delay_ms', 'timing'),
+        'distribution': ('random_delay_ms', 'timing'),
+        'seed': ('random_delay_ms', 'timing'),
+    }
+    MAX_COMMANDS_PER_TICK = 100
+
     def __init__(self):
         super().__init__()
         # --- State ---
@@ -88,22 +91,37 @@ class App(ctk.CTk):
         self.toggle_hotkey_action = {keyboard.Key.f6}
         self.hold_hotkey_action = {keyboard.Key.f7}
         self.custom_key_action = [{'type': 'press', 'key': 'e'}, {'type': 'release', 'key': 'e'}]
-        self.active_thread = None
+        self.executor = None  # Created on first start and reused for every later run
+        self.injections = InjectionLedger()  # Keys we inject, so the hotkey listener can ignore them
         self.active_recorder = None
+        self.macro_recorder = None
         self.picked_pos = None
+        self.path_points = []
+        self.text_file = None
+        self.cursor_widgets = None
+        self.cursor_state = "normal"
+        self.profile_store = ProfileStore()
+        self.hotkey_index = HotkeyIndex()
+        self.timeline_scheduler = None
+        self.applied_settings = {}  # What the running executor was last built or updated from
+        # Listener threads never touch widgets or state directly; they post here for the Tk loop
+        self.commands = queue.SimpleQueue()
+        self._last_stats_second = -1
 
         # --- Window Setup ---
         self.title("Python AutoClicker")
-        self.geometry("340x560") 
+        self.geometry("340x795") 
         self.resizable(False, False)
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
         ctk.set_appearance_mode("Dark")
         self.grid_columnconfigure(0, weight=1)
 
         self._create_widgets()
-        self.hotkey_listener = HotkeyListener(self)
-        self.hotkey_listener.start()
-        self.update_stats_display()
+        self.bind_hotkeys()
+        self.hotkey_listener = HotkeyListener(self.hotkey_index, self.injections)
+        # Opening the shared input hooks waits until the first frame is on screen
+        self.after_idle(self.hotkey_listener.start)
+        self.process_commands()
         self.on_timing_mode_change()
         self.on_target_change()
 
@@ -118,14 +136,14 @@ class App(ctk.CTk):
             return False
 
     def _create_widgets(self):
-        vcmd = (self.register(self._validate_decimal), '%P')
+        self.vcmd = vcmd = (self.register(self._validate_decimal), '%P')
 
         # -- Status Bar Frame --
         self.status_bar_frame = ctk.CTkFrame(self, corner_radius=0)
         self.status_bar_frame.grid(row=0, column=0, padx=5, pady=(5,0), sticky="ew")
         self.status_label = ctk.CTkLabel(self.status_bar_frame, text="Status: Idle", font=("Arial", 16, "bold"), text_color="red")
         self.status_label.pack(side="left", padx=5, pady=2)
-        self.stats_label = ctk.CTkLabel(self.status_bar_frame, text="Uptime: 00:00:00 | Total Clicks: 0")
+        self.stats_label = ctk.CTkLabel(self.status_bar_frame, text="Uptime: 00:00:00 | 0.0 CPS (p99 0.0 ms)\nTotal Clicks: 0", justify="right")
         self.stats_label.pack(side="right", padx=5, pady=2)
 
         # -- Main Content Frames --
@@ -150,6 +168,13 @@ class App(ctk.CTk):
         ctk.CTkRadioButton(custom_key_frame, text="Custom Key", variable=self.target_var, value="Key", command=self.on_target_change).pack(side="left")
         self.custom_key_button = ctk.CTkButton(custom_key_frame, text=f"Set ( {format_action_sequence(self.custom_key_action)} )", command=self.set_custom_key, width=100)
         self.custom_key_button.pack(side="left", padx=5)
+        text_frame = ctk.CTkFrame(self.action_frame, fg_color="transparent")
+        text_frame.grid(row=3, column=0, columnspan=2, pady=5, padx=5, sticky="ew")
+        ctk.CTkRadioButton(text_frame, text="Type Text", variable=self.target_var, value="Text", command=self.on_target_change).pack(side="left")
+        self.text_entry = ctk.CTkEntry(text_frame, placeholder_text="Text, e.g. Line {n}\\n")
+        self.text_entry.pack(side="left", fill="x", expand=True, padx=5)
+        self.text_file_button = ctk.CTkButton(text_frame, text="Load File", command=self.load_text_file, width=70)
+        self.text_file_button.pack(side="left")
 
         # -- 2. Click Type Frame --
         self.type_frame.grid_columnconfigure(0, weight=1)
@@ -168,22 +193,17 @@ class App(ctk.CTk):
         self.cps_frame = ctk.CTkFrame(timing_container, fg_color="transparent")
         self.interval_frame = ctk.CTkFrame(timing_container, fg_color="transparent")
 
-        ctk.CTkLabel(self.cps_frame, text="Clicks Per Second:").pack(anchor="w")
+        cps_header_frame = ctk.CTkFrame(self.cps_frame, fg_color="transparent")
+        cps_header_frame.pack(fill="x")
+        ctk.CTkLabel(cps_header_frame, text="Clicks Per Second:").pack(side="left")
+        self.burst_switch = ctk.CTkSwitch(cps_header_frame, text="Burst Mode")
+        self.burst_switch.pack(side="right")
         self.cps_entry = ctk.CTkEntry(self.cps_frame, validate="key", validatecommand=vcmd)
         self.cps_entry.pack(fill="x", expand=True, pady=(0, 5))
         self.cps_entry.insert(0, "10")
+        self.cps_entry.bind("<KeyRelease>", self.apply_live_settings)
         
-        interval_entries_frame = ctk.CTkFrame(self.interval_frame, fg_color="transparent")
-        interval_entries_frame.pack(fill="x", expand=True)
-        self.interval_entries = {}
-        labels = ["Hours", "Mins", "Secs", "Ms"]
-        for i, label_text in enumerate(labels):
-            interval_entries_frame.grid_columnconfigure(i, weight=1)
-            ctk.CTkLabel(interval_entries_frame, text=label_text).grid(row=0, column=i)
-            entry = ctk.CTkEntry(interval_entries_frame, validate="key", validatecommand=vcmd)
-            entry.grid(row=1, column=i, padx=(0,5), sticky="ew")
-            entry.insert(0, "0")
-            self.interval_entries[label_text.lower()] = entry
+        self.interval_entries = {}  # Built the first time Interval mode is chosen
         
         common_timing_frame = ctk.CTkFrame(self.type_frame, fg_color="transparent")
         common_timing_frame.grid(row=3, column=0, sticky="ew", padx=5, pady=(5,0))
@@ -192,24 +212,44 @@ class App(ctk.CTk):
         self.random_entry = ctk.CTkEntry(common_timing_frame, validate="key", validatecommand=vcmd)
         self.random_entry.grid(row=1, column=0, sticky="ew", padx=(0,5))
         self.random_entry.insert(0, "0")
+        self.random_entry.bind("<KeyRelease>", self.apply_live_settings)
         ctk.CTkLabel(common_timing_frame, text="Stop After (clicks):").grid(row=0, column=1, sticky="w")
         self.stop_at_entry = ctk.CTkEntry(common_timing_frame, validate="key", validatecommand=vcmd)
         self.stop_at_entry.grid(row=1, column=1, sticky="ew", padx=(5,0))
         self.stop_at_entry.insert(0, "0")
+        ctk.CTkLabel(common_timing_frame, text="Delay Distribution:").grid(row=2, column=0, sticky="w")
+        self.distribution_var = ctk.StringVar(value="Uniform")
+        ctk.CTkOptionMenu(common_timing_frame, variable=self.distribution_var, values=list(self.DISTRIBUTIONS), command=self.apply_live_settings).grid(row=3, column=0, sticky="ew", padx=(0,5))
+        ctk.CTkLabel(common_timing_frame, text="Seed (optional):").grid(row=2, column=1, sticky="w")
+        self.seed_entry = ctk.CTkEntry(common_timing_frame, validate="key", validatecommand=vcmd)
+        self.seed_entry.grid(row=3, column=1, sticky="ew", padx=(5,0))
         
         # -- 3. Cursor Position Frame --
         self.cursor_frame.grid_columnconfigure((0, 1), weight=1)
         ctk.CTkLabel(self.cursor_frame, text="Cursor Position", font=("Arial", 14, "bold")).grid(row=0, column=0, columnspan=2, pady=5)
         self.cursor_var = ctk.StringVar(value="Current")
-        ctk.CTkRadioButton(self.cursor_frame, text="At Current Position", variable=self.cursor_var, value="Current").grid(row=1, column=0, padx=5, sticky="w")
+        ctk.CTkRadioButton(self.cursor_frame, text="At Current Position", variable=self.cursor_var, value="Current", command=self.apply_live_settings).grid(row=1, column=0, padx=5, sticky="w")
         self.custom_loc_frame = ctk.CTkFrame(self.cursor_frame, fg_color="transparent")
         self.custom_loc_frame.grid(row=1, column=1, padx=5, sticky="w")
-        self.radio_picked = ctk.CTkRadioButton(self.custom_loc_frame, text="At Custom Location", variable=self.cursor_var, value="Picked")
+        self.radio_picked = ctk.CTkRadioButton(self.custom_loc_frame, text="At Custom Location", variable=self.cursor_var, value="Picked", command=self.apply_live_settings)
         self.radio_picked.pack(anchor="w")
         self.pick_button = ctk.CTkButton(self.custom_loc_frame, text="Pick Location", command=self.pick_location, width=120)
         self.pick_button.pack(pady=2, anchor="w")
         self.picked_pos_label = ctk.CTkLabel(self.custom_loc_frame, text="X: None, Y: None")
         self.picked_pos_label.pack(anchor="w")
+        path_options_frame = ctk.CTkFrame(self.cursor_frame, fg_color="transparent")
+        path_options_frame.grid(row=2, column=0, padx=5, sticky="nw")
+        ctk.CTkRadioButton(path_options_frame, text="Multiple Points", variable=self.cursor_var, value="Path", command=self.apply_live_settings).pack(anchor="w")
+        self.path_order_var = ctk.StringVar(value="In Order")
+        ctk.CTkOptionMenu(path_options_frame, variable=self.path_order_var, values=list(self.PATH_ORDERS), width=120, command=self.apply_live_settings).pack(pady=2, anchor="w")
+        path_points_frame = ctk.CTkFrame(self.cursor_frame, fg_color="transparent")
+        path_points_frame.grid(row=2, column=1, padx=5, sticky="w")
+        path_buttons_frame = ctk.CTkFrame(path_points_frame, fg_color="transparent")
+        path_buttons_frame.pack(anchor="w")
+        ctk.CTkButton(path_buttons_frame, text="Pick Points", command=self.pick_points, width=80).pack(side="left", pady=2)
+        ctk.CTkButton(path_buttons_frame, text="Load", command=self.load_path_points, width=40).pack(side="left", padx=(5,0), pady=2)
+        self.path_points_label = ctk.CTkLabel(path_points_frame, text="Points: 0")
+        self.path_points_label.pack(anchor="w")
 
         # -- 4. Controls Frame --
         self.controls_frame.grid_columnconfigure((0,1), weight=1)
@@ -217,32 +257,105 @@ class App(ctk.CTk):
         self.toggle_hotkey_button.grid(row=0, column=0, padx=(0,5), pady=2, sticky="ew")
         self.hold_hotkey_button = ctk.CTkButton(self.controls_frame, text=f"Hold: {format_action_sequence(self.hold_hotkey_action)}", command=self.set_hold_hotkey)
         self.hold_hotkey_button.grid(row=0, column=1, padx=(5,0), pady=2, sticky="ew")
+        self.save_profile_button = ctk.CTkButton(self.controls_frame, text="Save Settings as Profile Hotkey", command=self.save_profile)
+        self.save_profile_button.grid(row=1, column=0, columnspan=2, pady=2, sticky="ew")
+        self.record_macro_button = ctk.CTkButton(self.controls_frame, text="Record Macro", command=self.record_macro)
+        self.record_macro_button.grid(row=2, column=0, padx=(0,5), pady=2, sticky="ew")
+        self.play_macro_button = ctk.CTkButton(self.controls_frame, text="Play Macro", command=self.play_macro)
+        self.play_macro_button.grid(row=2, column=1, padx=(5,0), pady=2, sticky="ew")
         
         bottom_controls_frame = ctk.CTkFrame(self.controls_frame, fg_color="transparent")
-        bottom_controls_frame.grid(row=1, column=0, columnspan=2, sticky="ew")
+        bottom_controls_frame.grid(row=3, column=0, columnspan=2, sticky="ew")
         self.theme_switch = ctk.CTkSwitch(bottom_controls_frame, text="Light Mode", command=self.toggle_theme)
         self.theme_switch.pack(side="left", padx=5, pady=5)
-        help_text = (
+        self.export_button = ctk.CTkButton(bottom_controls_frame, text="Export Stats", command=self.export_stats, width=90)
+        self.export_button.pack(side="left", padx=5, pady=5)
+        self.help_button = ctk.CTkButton(bottom_controls_frame, text="?", width=28)
+        Tooltip(self.help_button, self.help_text)
+        self.help_button.pack(side="right", padx=5, pady=5)
+        
+    def help_text(self):
+        return (
             "--- AutoClicker Help ---\n"
             "Toggle Hotkey: Press once to start, press again to stop.\n"
             "Hold Hotkey: Action is active only while held down.\n"
-            "Each hotkey can be a key combination (e.g., Ctrl+F).\n\n"
+            "Each hotkey can be a key combination (e.g., Ctrl+F).\n"
+            "Profile Hotkey: Saves the current settings; its hotkey toggles them.\n"
+            "Several profiles can run at once, each at its own rate.\n\n"
             "Click Action: Choose what to automate.\n"
-            "- Set Key: Records your next action (e.g., a side mouse button).\n\n"
+            "- Set Key: Records your next action (e.g., a side mouse button).\n"
+            "- Type Text: Types the text (or a loaded file) one character per click;\n"
+            "  {n} counts repetitions, {date}, {time} and {rand:1-100} are filled in.\n\n"
             "Click Type: Set clicks/sec or a fixed interval.\n"
-            "- Random Delay: Adds a random +/- variance to the timing.\n\n"
-            "Cursor Position: Choose where mouse clicks happen."
+            f"- Burst Mode: Batches clicks to allow up to {self.MAX_BURST_CPS} clicks/sec (normally {self.MAX_CPS}).\n"
+            "- Random Delay: Adds a random +/- variance to the timing.\n"
+            "- Distribution/Seed: Shape of the variance; a seed repeats it exactly.\n\n"
+            "Cursor Position: Choose where mouse clicks happen.\n"
+            "- Multiple Points: Pick Points adds each left click; right-click to finish.\n"
+            "  Points are visited in order, at random, or along the shortest route.\n\n"
+            "Record Macro: Records all mouse and keyboard input to a file; Esc stops.\n"
+            "Play Macro: Replays a recorded .acm file once; the toggle hotkey stops it.\n\n"
+            "Rate, delay, target and position changes apply while running."
         )
-        self.help_button = ctk.CTkButton(bottom_controls_frame, text="?", width=28)
-        Tooltip(self.help_button, help_text)
-        self.help_button.pack(side="right", padx=5, pady=5)
-        
+
+    def threadsafe(self, func):
+        """Wraps `func` so calling it from any thread only queues it for the Tk loop."""
+        put = self.commands.put
+        return lambda *args: put((func, args))
+
+    def process_commands(self):
+        handled = 0
+        try:
+            while handled < self.MAX_COMMANDS_PER_TICK:
+                try:
+                    func, args = self.commands.get_nowait()
+                except queue.Empty:
+                    break
+                handled += 1
+                try:
+                    func(*args)
+                except Exception:
+                    # One failing command must not stop the queue from being drained
+                    traceback.print_exc()
+            # Stats follow events immediately; otherwise they only change when the uptime second ticks
+            uptime_second = int(time.time() - self.start_time)
+            if handled or uptime_second != self._last_stats_second:
+                self._last_stats_second = uptime_second
+                self.update_stats_display()
+        finally:
+            self.after(self.COMMAND_POLL_MS, self.process_commands)
+
+    def bind_hotkeys(self):
+        self.hotkey_index.bind("toggle", self.toggle_hotkey_action, self.threadsafe(self.toggle_action))
+        self.hotkey_index.bind("hold", self.hold_hotkey_action, self.threadsafe(self.start_action), self.threadsafe(self.stop_action))
+        for name, keys in self.profile_store.hotkeys().items():
+            self.bind_profile_hotkey(name, keys)
+
+    def bind_profile_hotkey(self, name, keys):
+        toggle = self.threadsafe(self.toggle_profile)
+        self.hotkey_index.bind(f"profile:{name}", keys, lambda: toggle(name))
+
+    def _build_interval_frame(self):
+        interval_entries_frame = ctk.CTkFrame(self.interval_frame, fg_color="transparent")
+        interval_entries_frame.pack(fill="x", expand=True)
+        labels = ["Hours", "Mins", "Secs", "Ms"]
+        for i, label_text in enumerate(labels):
+            interval_entries_frame.grid_columnconfigure(i, weight=1)
+            ctk.CTkLabel(interval_entries_frame, text=label_text).grid(row=0, column=i)
+            entry = ctk.CTkEntry(interval_entries_frame, validate="key", validatecommand=self.vcmd)
+            entry.grid(row=1, column=i, padx=(0,5), sticky="ew")
+            entry.insert(0, "0")
+            entry.bind("<KeyRelease>", self.apply_live_settings)
+            self.interval_entries[label_text.lower()] = entry
+
     def on_timing_mode_change(self):
         if self.app_state == "Active": return # Prevent change while active
         if self.timing_mode_var.get() == "CPS":
             self.interval_frame.pack_forget()
             self.cps_frame.pack(fill="x", expand=True)
         else:
+            if not self.interval_entries:
+                self._build_interval_frame()
             self.cps_frame.pack_forget()
             self.interval_frame.pack(fill="x", expand=True)
 
@@ -258,35 +371,59 @@ class App(ctk.CTk):
     def update_stats_display(self):
         uptime_str = format_time(time.time() - self.start_time)
         current_run_actions = 0
-        if self.active_thread and self.active_thread.is_alive():
-            current_run_actions = self.active_thread.actions_done
+        live_cps, p99 = 0.0, 0.0
+        if self.executor and self.executor.active:
+            current_run_actions = self.executor.actions_done
+            metrics = self.executor.metrics
+            live_cps, p99 = metrics.actual_cps, metrics.intervals.percentile(99)
+        if self.timeline_scheduler:
+            current_run_actions += self.timeline_scheduler.completed_actions
+            current_run_actions += sum(t.actions_done for t in list(self.timeline_scheduler.timelines.values()))
         display_actions = self.total_actions + current_run_actions
-        self.stats_label.configure(text=f"Uptime: {uptime_str} | Total Clicks: {display_actions}")
-        self.after(1000, self.update_stats_display)
+        self.stats_label.configure(text=f"Uptime: {uptime_str} | {live_cps:.1f} CPS (p99 {p99:.1f} ms)\nTotal Clicks: {display_actions}")
+
+    def export_stats(self):
+        metrics = self.executor.metrics if self.executor else None
+        if metrics is None: return
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json"), ("CSV", "*.csv")])
+        if path:
+            export_snapshot(metrics.snapshot(), path)
 
     def on_target_change(self):
-        if self.app_state == "Active": return # Prevent change while active
+        if self.app_state == "Active":
+            self.apply_live_settings()
+            return
         is_mouse_action = self.target_var.get() in ["Left", "Middle", "Right"]
         state = "normal" if is_mouse_action else "disabled"
-        def set_state_recursive(widget):
-            try:
-                if 'state' in widget.configure():
-                    widget.configure(state=state)
-            except Exception:
-                pass
-            for child in widget.winfo_children():
-                set_state_recursive(child)
-        set_state_recursive(self.cursor_frame)
+        if state == self.cursor_state:
+            return
+        if self.cursor_widgets is None:
+            # Walked once; afterwards a target change only reconfigures these
+            self.cursor_widgets = []
+            pending = [self.cursor_frame]
+            while pending:
+                widget = pending.pop()
+                try:
+                    if 'state' in widget.configure():
+                        self.cursor_widgets.append(widget)
+                except Exception:
+                    pass
+                pending.extend(widget.winfo_children())
+        for widget in self.cursor_widgets:
+            widget.configure(state=state)
+        self.cursor_state = state
 
     def set_toggle_hotkey(self):
         if self.app_state == "Active": return # Prevent change while active
         if self.active_recorder: return
         self.toggle_hotkey_button.configure(text="Recording...")
-        self.active_recorder = ActionRecorder(callback=self.on_toggle_hotkey_recorded, hotkey_mode=True)
+        self.active_recorder = ActionRecorder(callback=self.threadsafe(self.on_toggle_hotkey_recorded), hotkey_mode=True)
         self.active_recorder.start()
 
     def on_toggle_hotkey_recorded(self, key_combination):
-        if key_combination: self.toggle_hotkey_action = key_combination
+        if key_combination:
+            self.toggle_hotkey_action = key_combination
+            self.hotkey_index.bind("toggle", key_combination, self.threadsafe(self.toggle_action))
         self.toggle_hotkey_button.configure(text=f"Toggle: {format_action_sequence(self.toggle_hotkey_action)}")
         self.active_recorder = None
 
@@ -294,11 +431,13 @@ class App(ctk.CTk):
         if self.app_state == "Active": return # Prevent change while active
         if self.active_recorder: return
         self.hold_hotkey_button.configure(text="Recording...")
-        self.active_recorder = ActionRecorder(callback=self.on_hold_hotkey_recorded, hotkey_mode=True)
+        self.active_recorder = ActionRecorder(callback=self.threadsafe(self.on_hold_hotkey_recorded), hotkey_mode=True)
         self.active_recorder.start()
 
     def on_hold_hotkey_recorded(self, key_combination):
-        if key_combination: self.hold_hotkey_action = key_combination
+        if key_combination:
+            self.hold_hotkey_action = key_combination
+            self.hotkey_index.bind("hold", key_combination, self.threadsafe(self.start_action), self.threadsafe(self.stop_action))
         self.hold_hotkey_button.configure(text=f"Hold: {format_action_sequence(self.hold_hotkey_action)}")
         self.active_recorder = None
 
@@ -306,9 +445,19 @@ class App(ctk.CTk):
         if self.app_state == "Active": return # Prevent change while active
         if self.active_recorder: return
         self.custom_key_button.configure(text="Recording...")
-        self.active_recorder = ActionRecorder(callback=self.on_custom_key_recorded, restrict_mouse=True)
+        self.active_recorder = ActionRecorder(callback=self.threadsafe(self.on_custom_key_recorded), restrict_mouse=True)
         self.active_recorder.start()
 
+    def load_text_file(self):
+        if self.app_state == "Active": return # Prevent change while active
+        path = filedialog.askopenfilename(filetypes=[("Text", "*.txt"), ("All files", "*")])
+        if not path: return
+        self.text_file = path
+        self.text_entry.delete(0, "end")
+        self.text_entry.configure(placeholder_text=f"File: {os.path.basename(path)}")
+        self.target_var.set("Text")
+        self.on_target_change()
+
     def on_custom_key_recorded(self, event_sequence):
         if event_sequence: self.custom_key_action = event_sequence
         self.custom_key_button.configure(text=f"Set ( {format_action_sequence(self.custom_key_action)} )")
@@ -320,61 +469,239 @@ class App(ctk.CTk):
         elif self.app_state == "Idle":
             self.start_action()
 
+    def toggle_profile(self, name):
+        """Starts or stops a profile as its own timeline, alongside the main action and other profiles."""
+        if self.timeline_scheduler is None:
+            self.timeline_scheduler = TimelineScheduler(TaggedBackend(create_backend(), self.injections))
+            self.timeline_scheduler.start()
+        if self.timeline_scheduler.remove(name) is not None:
+            return  # Its count reaches completed_actions once its last action is done
+        try:
+            settings = self.profile_store.load(name)
+            self.timeline_scheduler.add(name, settings['delay'], settings['stop_count'], build_action_sequence(settings),
+                                        build_click_target(settings), settings.get('random_ms', 0), timing=build_timing(settings))
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def collect_settings(self):
+        """Reads the current GUI fields into a settings dict (raises ValueError on bad input)."""
+        burst = False
+        if self.timing_mode_var.get() == "CPS":
+            burst = bool(self.burst_switch.get())
+            cps = float(self.cps_entry.get() or 1)
+            cps = min(cps, self.MAX_BURST_CPS if burst else self.MAX_CPS)
+            delay = 1.0 / (cps if cps > 0 else 1)
+        else:
+            h = float(self.interval_entries['hours'].get() or 0)
+            m = float(self.interval_entries['mins'].get() or 0)
+            s = float(self.interval_entries['secs'].get() or 0)
+            ms = float(self.interval_entries['ms'].get() or 0)
+            delay = (h * 3600) + (m * 60) + s + (ms / 1000)
+        text = self.text_entry.get().replace("\\n", "\n").replace("\\t", "\t")
+        return {
+            'target': self.target_var.get(),
+            'custom_key_action': self.custom_key_action,
+            'text': text,
+            'text_file': None if text else self.text_file,  # Typed text takes precedence over a loaded file
+            'delay': delay,
+            'random_ms': int(self.random_entry.get() or 0),
+            'stop_count': int(self.stop_at_entry.get() or 0),
+            'click_pos': self.picked_pos if self.cursor_var.get() == "Picked" else None,
+            'click_path': self.collect_click_path(),
+            'burst': burst,
+            'distribution': self.DISTRIBUTIONS[self.distribution_var.get()],
+            'seed': int(self.seed_entry.get()) if self.seed_entry.get() else None,
+        }
+
+    def collect_click_path(self):
+        if self.cursor_var.get() != "Path" or not self.path_points:
+            return None
+        return {'points': list(self.path_points), 'order': self.PATH_ORDERS[self.path_order_var.get()]}
+
     def start_action(self):
         if self.app_state != "Idle": return
+        try:
+            settings = self.collect_settings()
+        except (ValueError, ctk.TclError):
+            return
+        self.run_settings(settings)
+
+    def executor_params(self, settings, fields=None):
+        """Builds the executor parameters for a run, or with `fields` only those (for a live update)."""
+        builders = {
+            'delay_seconds': lambda: settings['delay'],
+            'stop_count': lambda: settings['stop_count'],
+            'action_sequence': lambda: build_action_sequence(settings),
+            'click_pos': lambda: build_click_target(settings),
+            'random_delay_ms': lambda: settings.get('random_ms', 0),
+            'timing': lambda: build_timing(settings),
+        }
+        if fields is None:
+            return dict({name: build() for name, build in builders.items()}, macro=None)
+        return {name: builders[name]() for name in fields}
+
+    def run_settings(self, settings):
+        if self.app_state != "Idle": return
+        try:
+            params = self.executor_params(settings)
+        except (ValueError, KeyError, OSError):
+            return
+        self.applied_settings = settings
+        self.run_executor(params, settings.get('burst', False))
+
+    def run_executor(self, params, burst=False):
+        if self.executor is None:
+            self.executor = ActionExecutor(**params, burst=burst, persistent=True,
+                                           backend=TaggedBackend(create_backend(), self.injections),
+                                           on_finished=self.threadsafe(self.on_run_finished))
+            self.executor.start()
+        else:
+            # A run that hit its stop count may not have been collected by on_run_finished yet
+            self.total_actions += self.executor.stop_run()
+            self.executor.start_run(burst=burst, **params)
         self.update_status("Active", "green")
+
+    def apply_live_settings(self, *_):
+        """Swaps edited rate, jitter, target and position into the running executor."""
+        if self.app_state != "Active" or self.executor is None: return
+        if self.executor.macro is not None: return  # A macro plays at its recorded times
         try:
-            stop_count = int(self.stop_at_entry.get() or 0)
-            random_ms = int(self.random_entry.get() or 0)
-            delay = 0
-            if self.timing_mode_var.get() == "CPS":
-                cps = float(self.cps_entry.get() or 1)
-                delay = 1.0 / (cps if cps > 0 else 1)
-            else:
-                h = float(self.interval_entries['hours'].get() or 0)
-                m = float(self.interval_entries['mins'].get() or 0)
-                s = float(self.interval_entries['secs'].get() or 0)
-                ms = float(self.interval_entries['ms'].get() or 0)
-                delay = (h * 3600) + (m * 60) + s + (ms / 1000)
-            
-            target_selection = self.target_var.get()
-            action_sequence = []
-            if target_selection == "Left":
-                action_sequence = [{'type': 'click', 'button': mouse.Button.left}]
-            elif target_selection == "Middle":
-                action_sequence = [{'type': 'click', 'button': mouse.Button.middle}]
-            elif target_selection == "Right":
-                action_sequence = [{'type': 'click', 'button': mouse.Button.right}]
-            else:
-                action_sequence = self.custom_key_action
-            pos = self.picked_pos if self.cursor_var.get() == "Picked" else None
-            self.active_thread = ActionExecutor(delay, stop_count, action_sequence, pos, random_ms)
-            self.active_thread.start()
+            settings = self.collect_settings()
+            # Only what an edited field feeds is rebuilt, so the click path, the typed text and a
+            # seeded offset sequence carry on from where they are
+            fields = set()
+            for key, value in settings.items():
+                if value != self.applied_settings.get(key):
+                    fields.update(self.LIVE_PARAMS.get(key, ()))
+            params = self.executor_params(settings, fields)
+        except (ValueError, KeyError, OSError, ctk.TclError):
+            return
+        self.applied_settings = settings
+        if params:
+            self.executor.update(**params)
+
+    def save_profile(self):
+        if self.app_state == "Active": return # Prevent change while active
+        if self.active_recorder: return
+        try:
+            settings = self.collect_settings()
         except (ValueError, ctk.TclError):
-            self.update_status("Idle", "red")
+            return
+        name = ctk.CTkInputDialog(text="Profile name:", title="Save Profile").get_input()
+        if not name: return
+        self.save_profile_button.configure(text="Press profile hotkey...")
+        def on_recorded(key_combination):
+            if key_combination:
+                self.profile_store.save(name, key_combination, settings)
+                self.bind_profile_hotkey(name, key_combination)
+            self.save_profile_button.configure(text="Save Settings as Profile Hotkey")
+            self.active_recorder = None
+        self.active_recorder = ActionRecorder(callback=self.threadsafe(on_recorded), hotkey_mode=True)
+        self.active_recorder.start()
+
+    def record_macro(self):
+        if self.app_state != "Idle": return
+        if self.active_recorder: return
+        path = filedialog.asksaveasfilename(defaultextension=MACRO_EXTENSION,
+                                            filetypes=[("Macro", f"*{MACRO_EXTENSION}"), ("JSON lines", "*.jsonl")])
+        if not path: return
+        try:
+            self.macro_recorder = MacroRecorder(path, on_finished=self.threadsafe(self.on_macro_recorded))
+        except OSError:
+            return
+        self.macro_recorder.start()
+        self.record_macro_button.configure(text="Recording... (Esc to stop)")
+        self.update_status("Recording", "blue")
+
+    def play_macro(self):
+        if self.app_state != "Idle": return
+        path = filedialog.askopenfilename(filetypes=[("Macro", f"*{MACRO_EXTENSION}")])
+        if not path: return
+        try:
+            playback = MacroPlayback(path)
+        except (OSError, ValueError):
+            return
+        # The recorded times replace the rate and the action settings for this run
+        self.run_executor({'delay_seconds': 1.0, 'stop_count': 0, 'action_sequence': [], 'click_pos': None,
+                           'random_delay_ms': 0, 'timing': None, 'macro': playback})
+
+    def on_macro_recorded(self, path, event_count):
+        self.macro_recorder = None
+        self.record_macro_button.configure(text="Record Macro")
+        self.update_status("Idle", "red")
+        self.status_label.configure(text=f"Status: Idle ({event_count} events recorded)")
+
+    def on_run_finished(self, executor):
+        # The run reached its stop count on its own or failed (and no new run has started since)
+        if self.app_state == "Active" and not executor.active:
+            self.stop_action()
+            if executor.error is not None:
+                self.status_label.configure(text=f"Status: Idle (run failed: {executor.error})")
 
     def stop_action(self):
-        if self.active_thread:
-            self.active_thread.stop()
-            self.active_thread.join(timeout=0.1) 
-            self.total_actions += self.active_thread.actions_done
-            self.active_thread = None
+        if self.executor:
+            # Returns within a millisecond with the run's exact count; the thread stays parked
+            self.total_actions += self.executor.stop_run()
         self.update_status("Idle", "red")
     
     def pick_location(self):
         if self.app_state == "Active": return # Prevent change while active
         self.update_status("Picking...", "blue")
+        on_picked = self.threadsafe(self.on_location_picked)
         def on_click(x, y, button, pressed):
             if pressed:
-                self.picked_pos = (x, y)
-                self.picked_pos_label.configure(text=f"X: {x}, Y: {y}")
-                self.update_status("Idle", "red")
+                on_picked(x, y)
                 return False 
-        mouse_listener = mouse.Listener(on_click=on_click)
-        mouse_listener.start()
+        get_hub().subscribe(click=on_click)
+
+    def pick_points(self):
+        if self.app_state == "Active": return # Prevent change while active
+        self.update_status("Picking...", "blue")
+        self.path_points = []
+        on_point = self.threadsafe(self.on_path_point_picked)
+        on_done = self.threadsafe(self.on_path_picking_done)
+        def on_click(x, y, button, pressed):
+            if not pressed:
+                return
+            if button == mouse.Button.right:
+                on_done()
+                return False
+            on_point(x, y)
+        get_hub().subscribe(click=on_click)
+
+    def on_path_point_picked(self, x, y):
+        self.path_points.append((x, y))
+        self.path_points_label.configure(text=f"Points: {len(self.path_points)}")
+
+    def on_path_picking_done(self):
+        self.cursor_var.set("Path")
+        self.update_status("Idle", "red")
+
+    def load_path_points(self):
+        if self.app_state == "Active": return # Prevent change while active
+        path = filedialog.askopenfilename(filetypes=[("Point lists", "*.json *.txt *.csv"), ("All files", "*")])
+        if not path: return
+        try:
+            self.path_points = load_points(path)
+        except (OSError, ValueError):
+            return
+        self.path_points_label.configure(text=f"Points: {len(self.path_points)}")
+        self.cursor_var.set("Path")
+
+    def on_location_picked(self, x, y):
+        self.picked_pos = (x, y)
+        self.picked_pos_label.configure(text=f"X: {x}, Y: {y}")
+        self.update_status("Idle", "red")
 
     def on_closing(self):
         self.stop_action()
+        if self.macro_recorder:
+            self.macro_recorder.stop()  # Flushes what was recorded so far
+        if self.executor:
+            self.executor.shutdown()
+        if self.timeline_scheduler:
+            self.timeline_scheduler.stop()
         if hasattr(self, 'hotkey_listener'):
             self.hotkey_listener.stop()
+        get_hub().stop()
         self.destroy()
\ No newline at end of file
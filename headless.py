@@ -0,0 +1,359 @@
+# headless.py
+"""Runs the autoclicker without a GUI, controlled by hotkeys and a Unix domain socket.
+
+Usage:
+    python main.py --headless config.json
+    python headless.py --send status --socket /tmp/autoclicker.sock
+
+The config is JSON:
+    {
+        "settings": {"target": "Left", "delay": 0.1, "random_ms": 0, "stop_count": 0, "click_pos": null,
+                     "burst": false, "distribution": "uniform", "seed": null},
+        "toggle_hotkey": ["Key.f6"],
+        "hold_hotkey": ["Key.f7"],
+        "backend": "pynput",
+        "socket": "/tmp/autoclicker.sock",
+        "precision": "hybrid",
+        "catch_up": "skip",
+        "spin_threshold_ms": 0.5
+    }
+"distribution" is uniform, gaussian, lognormal or human; human also needs
+"timing_macro": the path of a recorded .acm macro to sample intervals from.
+"click_path": {"points": [[x, y], ...], "order": "sequence" | "random" | "route"}
+in "settings" cycles clicks over several points instead of "click_pos".
+"target": "Text" types "text" (a template, see text.py) or the file "text_file"
+one character per action.
+"settings" may be replaced by "profile": "<name>" to load a saved profile.
+"precision" is how the executor waits for each deadline: sleep, hybrid (sleep,
+then busy-wait the last "spin_threshold_ms") or spin. "catch_up" is what it
+does with deadlines it missed: skip, burst or stretch (see timing.py).
+An optional "conditions" object gates actions on screen regions; see
+screen.build_condition_monitor for its format.
+
+Socket commands are newline-terminated; every reply is one JSON line:
+    start | stop | toggle | status | set-rate <cps> | set-delay <seconds> | shutdown
+    record <path> | stop-record | play <path> [speed] [loops]
+"record" captures mouse and keyboard input to a macro (.acm, or JSON lines for
+any other extension) until "stop-record" or Esc. "play" replays an .acm macro
+as a run of the executor, so "stop" ends it; loops of 0 repeat until stopped.
+"""
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+import traceback
+
+from backend import ActionExecutor
+from hotkeys import HotkeyIndex, HotkeyListener
+from inputs import get_hub
+from loopback import InjectionLedger, TaggedBackend
+from macrofile import MacroPlayback
+from outputs import create_backend
+from profiles import ProfileStore, build_action_sequence, build_click_target, build_timing, deserialize_settings
+from recorder import MacroRecorder
+from timing import CATCH_UP_POLICIES, PRECISION_MODES
+from utils import deserialize_key
+
+DEFAULT_SOCKET = "/tmp/autoclicker.sock"
+EXECUTOR_OPTIONS = ('precision', 'catch_up', 'spin_threshold_ms')
+DEFAULT_SETTINGS = {'target': "Left", 'delay': 0.1, 'random_ms': 0, 'stop_count': 0, 'click_pos': None, 'burst': False}
+
+class HeadlessClicker:
+    """Owns the executor lifecycle; safe to drive from hotkey and socket threads at once."""
+    def __init__(self, settings, backend_name="pynput", executor_options=None):
+        self.settings = dict(settings)
+        self.backend_name = backend_name
+        self.executor_options = executor_options or {}  # precision, catch_up, spin_threshold_ms
+        self.backend = None
+        self.executor = None
+        self.total_actions = 0
+        self.start_time = time.time()
+        self.lock = threading.RLock()
+        self.shutdown_event = threading.Event()
+        self.gate = None
+        self.injections = InjectionLedger()
+        self.recorder = None
+        # Hotkey actions run here rather than on the shared input hook thread
+        self.commands = queue.SimpleQueue()
+        self.command_thread = threading.Thread(target=self._process_commands, daemon=True)
+
+    @property
+    def active(self):
+        return self.executor is not None and self.executor.active
+
+    def _run_params(self):
+        settings = self.settings
+        return {
+            'delay_seconds': settings['delay'],
+            'stop_count': settings['stop_count'],
+            'action_sequence': build_action_sequence(settings),
+            'click_pos': build_click_target(settings),
+            'random_delay_ms': settings.get('random_ms', 0),
+            'timing': build_timing(settings),
+            'gate': self.gate,
+            'macro': None,
+        }
+
+    def start(self):
+        with self.lock:
+            if self.active:
+                return False
+            return self._start_run(self._run_params(), self.settings.get('burst', False))
+
+    def play(self, path, speed=1.0, loops=1):
+        """Starts replaying a recorded .acm macro in place of the configured action."""
+        playback = MacroPlayback(path, speed, loops)
+        with self.lock:
+            if self.active:
+                return False
+            return self._start_run(dict(self._run_params(), stop_count=0, macro=playback))
+
+    def _start_run(self, params, burst=False):
+        # Called with the lock held
+        if self.executor is None:
+            # One executor thread serves every run; later starts only wake it
+            self.backend = TaggedBackend(create_backend(self.backend_name), self.injections)
+            self.executor = ActionExecutor(**params, backend=self.backend, burst=burst, persistent=True,
+                                           on_finished=self._on_run_finished, **self.executor_options)
+            self.executor.start()
+        else:
+            # A run that hit its stop count may not have been collected by _on_run_finished yet
+            self.total_actions += self.executor.stop_run()
+            self.executor.start_run(burst=burst, **params)
+        return True
+
+    def stop(self):
+        with self.lock:
+            if self.executor is None:
+                return False
+            self.total_actions += self.executor.stop_run()
+            return True
+
+    def _on_run_finished(self, executor):
+        # The run reached its stop count on its own; collect it unless a new run already started
+        with self.lock:
+            if not executor.active:
+                self.total_actions += executor.stop_run()
+
+    def start_recording(self, path):
+        with self.lock:
+            if self.recorder is not None and self.recorder.recording:
+                return False
+            self.recorder = MacroRecorder(path)
+            self.recorder.start()
+            return True
+
+    def stop_recording(self):
+        """Ends the current recording (if Esc has not already) and returns its event count."""
+        with self.lock:
+            recorder, self.recorder = self.recorder, None
+        if recorder is None:
+            return None
+        recorder.stop()
+        return recorder.event_count
+
+    def deferred(self, func):
+        """Wraps `func` so calling it from an input hook only queues it for the command thread."""
+        put = self.commands.put
+        return lambda: put(func)
+
+    def _process_commands(self):
+        while True:
+            func = self.commands.get()
+            if func is None:
+                break
+            try:
+                func()
+            except Exception:
+                # A failing start (e.g. a missing text_file) must not end the hotkeys
+                traceback.print_exc()
+
+    def close(self):
+        if self.command_thread.is_alive():
+            self.commands.put(None)
+        self.stop_recording()
+        with self.lock:
+            self.stop()
+            if self.executor is not None:
+                self.executor.shutdown()
+
+    def toggle(self):
+        with self.lock:
+            return self.stop() if self.active else self.start()
+
+    def set_delay(self, delay):
+        if delay <= 0:
+            raise ValueError("delay must be positive")
+        with self.lock:
+            self.settings['delay'] = delay
+            if self.executor is not None:
+                # Swapped into a running loop without restarting it
+                self.executor.update(delay_seconds=delay)
+
+    def status(self):
+        with self.lock:
+            executor = self.executor
+            status = {
+                'active': self.active,
+                'uptime': time.time() - self.start_time,
+                'target': self.settings.get('target'),
+                'cps': 1.0 / self.settings['delay'] if self.settings['delay'] else 0.0,
+                'total_actions': self.total_actions + (executor.actions_done if self.active else 0),
+                'recording': self.recorder is not None and self.recorder.recording,
+            }
+            if executor is not None:
+                status['actual_cps'] = executor.metrics.actual_cps
+                status['p99_ms'] = executor.metrics.intervals.percentile(99)
+                status['missed_deadlines'] = executor.metrics.missed_deadlines
+                if executor.error is not None:
+                    status['error'] = str(executor.error)
+            return status
+
+    def handle_command(self, line):
+        """Executes one control command and returns the reply dict."""
+        parts = line.split()
+        if not parts:
+            return {'ok': False, 'error': "empty command"}
+        command, args = parts[0].lower(), parts[1:]
+        try:
+            if command == "start":
+                return {'ok': True, 'changed': self.start()}
+            if command == "stop":
+                return {'ok': True, 'changed': self.stop()}
+            if command == "toggle":
+                return {'ok': True, 'changed': self.toggle()}
+            if command == "status":
+                return {'ok': True, 'status': self.status()}
+            if command == "set-rate":
+                cps = float(args[0])
+                if cps <= 0:
+                    raise ValueError("rate must be positive")
+                self.set_delay(1.0 / cps)
+                return {'ok': True}
+            if command == "set-delay":
+                self.set_delay(float(args[0]))
+                return {'ok': True}
+            if command == "record":
+                if not args:
+                    raise ValueError("record needs a file path")
+                return {'ok': True, 'changed': self.start_recording(" ".join(args))}
+            if command == "stop-record":
+                return {'ok': True, 'events': self.stop_recording()}
+            if command == "play":
+                speed = float(args[1]) if len(args) > 1 else 1.0
+                loops = int(args[2]) if len(args) > 2 else 1
+                return {'ok': True, 'changed': self.play(args[0], speed, loops)}
+            if command == "shutdown":
+                self.shutdown_event.set()
+                return {'ok': True}
+        except (IndexError, ValueError, KeyError, OSError) as e:
+            # e.g. a missing profile file or text_file, or an unwritable macro path
+            return {'ok': False, 'error': str(e) or f"bad arguments for {command}"}
+        return {'ok': False, 'error': f"unknown command: {command}"}
+
+class ControlHandler(socketserver.StreamRequestHandler):
+    # A connection may send any number of commands; each is answered immediately.
+    def handle(self):
+        for raw in self.rfile:
+            reply = self.server.clicker.handle_command(raw.decode("utf-8", "replace").strip())
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+class ControlServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, clicker):
+        if os.path.exists(path):
+            os.unlink(path)
+        self.clicker = clicker
+        super().__init__(path, ControlHandler)
+
+# Resolves a config's "profile" or "settings" entry into a full settings dict.
+def resolve_settings(config):
+    if 'profile' in config:
+        return dict(ProfileStore().load(config['profile']))
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update(deserialize_settings(config.get('settings', {})))
+    return settings
+
+# Picks the executor's timing options out of a config, rejecting unknown modes up front.
+def executor_options(config):
+    options = {name: config[name] for name in EXECUTOR_OPTIONS if name in config}
+    if options.get('precision', "hybrid") not in PRECISION_MODES:
+        raise ValueError(f"Unknown precision mode: {options['precision']}")
+    if options.get('catch_up', "skip") not in CATCH_UP_POLICIES:
+        raise ValueError(f"Unknown catch-up policy: {options['catch_up']}")
+    return options
+
+def load_config(path):
+    with open(path) as f:
+        config = json.load(f)
+    config['settings'] = resolve_settings(config)
+    return config
+
+def run(config):
+    clicker = HeadlessClicker(config['settings'], config.get('backend', "pynput"), executor_options(config))
+    if config.get('conditions'):
+        from screen import build_condition_monitor
+        clicker.gate = build_condition_monitor(config['conditions'])
+        clicker.gate.start()
+    clicker.command_thread.start()
+    index = HotkeyIndex()
+    index.bind("toggle", {deserialize_key(k) for k in config.get('toggle_hotkey', ["Key.f6"])},
+               clicker.deferred(clicker.toggle))
+    index.bind("hold", {deserialize_key(k) for k in config.get('hold_hotkey', ["Key.f7"])},
+               clicker.deferred(clicker.start), clicker.deferred(clicker.stop))
+    hotkey_listener = HotkeyListener(index, clicker.injections)
+    hotkey_listener.start()
+
+    socket_path = config.get('socket', DEFAULT_SOCKET)
+    server = ControlServer(socket_path, clicker)
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    print(f"Headless autoclicker listening on {socket_path}")
+    try:
+        clicker.shutdown_event.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        clicker.close()
+        if clicker.gate is not None:
+            clicker.gate.stop()
+        hotkey_listener.stop()
+        get_hub().stop()
+        server.shutdown()
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+# Sends one command to a running instance and returns the decoded reply.
+def send_command(command, socket_path=DEFAULT_SOCKET):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(command.encode("utf-8") + b"\n")
+        reply = sock.makefile("rb").readline()
+    return json.loads(reply)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the autoclicker without a GUI.")
+    parser.add_argument("config", nargs="?", help="JSON config file.")
+    parser.add_argument("--socket", help="Control socket path (overrides the config).")
+    parser.add_argument("--send", help="Send a command to a running instance and print the reply.")
+    args = parser.parse_args(argv)
+
+    if args.send:
+        print(json.dumps(send_command(args.send, args.socket or DEFAULT_SOCKET)))
+        return
+    if not args.config:
+        parser.error("a config file is required unless --send is used")
+    config = load_config(args.config)
+    if args.socket:
+        config['socket'] = args.socket
+    run(config)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# hotkeys.py
+from pynput import keyboard
+
+from inputs import get_hub
+
+# Reduces a key to the token used for matching, so 'A' and 'a' or equal KeyCodes compare the same.
+def hotkey_token(key):
+    if isinstance(key, keyboard.Key):
+        return key.name
+    char = getattr(key, 'char', key if isinstance(key, str) else None)
+    if char is not None:
+        return char.lower()
+    return f"vk:{key.vk}"
+
+def hotkey_signature(keys):
+    return frozenset(hotkey_token(k) for k in keys)
+
+class HotkeyBinding:
+    __slots__ = ('name', 'signature', 'on_press', 'on_release')
+
+    def __init__(self, name, keys, on_press, on_release=None):
+        self.name = name
+        self.signature = hotkey_signature(keys)
+        self.on_press = on_press
+        self.on_release = on_release
+
+class HotkeyIndex:
+    """Maps a frozenset of key tokens to its binding, so matching is a single dict lookup."""
+    def __init__(self):
+        self._by_signature = {}
+        self._by_name = {}
+
+    def bind(self, name, keys, on_press, on_release=None):
+        self.unbind(name)
+        binding = HotkeyBinding(name, keys, on_press, on_release)
+        if not binding.signature:
+            return None
+        # Swap in a new dict so listener threads never see a half-updated index
+        by_signature = dict(self._by_signature)
+        by_signature[binding.signature] = binding
+        self._by_signature = by_signature
+        self._by_name[name] = binding
+        return binding
+
+    def unbind(self, name):
+        binding = self._by_name.pop(name, None)
+        if binding is not None and self._by_signature.get(binding.signature) is binding:
+            by_signature = dict(self._by_signature)
+            del by_signature[binding.signature]
+            self._by_signature = by_signature
+
+    def match(self, signature):
+        return self._by_signature.get(signature)
+
+    def __len__(self):
+        return len(self._by_name)
+
+class HotkeyListener:
+    """Matches held keys against a HotkeyIndex, fed by the shared InputHub.
+
+    Events this process injected are dropped before any matching: those pynput
+    flags as injected, and those found in `ledger` (a loopback.InjectionLedger
+    fed by the output backends).
+    """
+    def __init__(self, index, ledger=None, hub=None):
+        self.index = index
+        self.ledger = ledger
+        self.hub = hub
+        self.pressed_tokens = set()
+        self.held_binding = None
+        self.subscription = None
+
+    def start(self):
+        if self.hub is None:
+            self.hub = get_hub()
+        # Injected events are included so their ledger entries are consumed too
+        self.subscription = self.hub.subscribe(press=self.on_press, release=self.on_release, injected=True)
+
+    def on_press(self, key, injected=False):
+        token = hotkey_token(key)
+        if self.ledger is not None and self.ledger.consume('press', token) is not None:
+            return
+        if injected:
+            return
+        if token in self.pressed_tokens:
+            return  # Key auto-repeat
+        self.pressed_tokens.add(token)
+        binding = self.index.match(frozenset(self.pressed_tokens))
+        if binding is not None:
+            if binding.on_release is not None:
+                self.held_binding = binding
+            binding.on_press()
+
+    def on_release(self, key, injected=False):
+        token = hotkey_token(key)
+        if self.ledger is not None and self.ledger.consume('release', token) is not None:
+            return
+        if injected:
+            return
+        # If the released key is part of the held hotkey, release the action
+        held = self.held_binding
+        if held is not None and token in held.signature:
+            self.held_binding = None
+            held.on_release()
+        self.pressed_tokens.discard(token)
+    
+    def stop(self):
+        if self.subscription is not None:
+            self.subscription.cancel()
+            self.subscription = None
@@ -0,0 +1,123 @@
+# inputs.py
+"""One shared pair of input hooks for every feature that listens to the user.
+
+On X11 each pynput Listener is its own RECORD connection and thread that sees
+every event. The hotkeys, recorders, location picking and the loopback probe
+therefore subscribe to one InputHub, which owns exactly one mouse and one
+keyboard listener and hands each event only to the subscribers of its kind.
+
+Handlers take pynput's callback arguments and, like pynput callbacks, end
+their subscription by returning False. Events this process injected reach
+only subscribers created with injected=True, which get the flag as an extra
+last argument.
+"""
+import threading
+
+KINDS = ('press', 'release', 'click', 'move', 'scroll')
+
+class Subscription:
+    __slots__ = ('hub', 'handlers', 'injected')
+
+    def __init__(self, hub, handlers, injected):
+        self.hub = hub
+        self.handlers = handlers
+        self.injected = injected
+
+    def cancel(self):
+        self.hub.unsubscribe(self)
+
+class InputHub:
+    """Starts the hooks on the first subscription and keeps them for the life of the process."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = []
+        # Per kind, (subscription, handler) tuples for real and for injected events; swapped, never mutated
+        self._dispatch = {kind: () for kind in KINDS}
+        self._dispatch_injected = {kind: () for kind in KINDS}
+        self.mouse_listener = None
+        self.keyboard_listener = None
+
+    def start(self):
+        with self._lock:
+            if self.keyboard_listener is not None:
+                return
+            from pynput import keyboard, mouse
+            self.keyboard_listener = keyboard.Listener(on_press=self._on_press, on_release=self._on_release)
+            self.mouse_listener = mouse.Listener(on_move=self._on_move, on_click=self._on_click,
+                                                 on_scroll=self._on_scroll)
+            self.keyboard_listener.start()
+            self.mouse_listener.start()
+        for listener in (self.keyboard_listener, self.mouse_listener):
+            if hasattr(listener, 'wait'):
+                listener.wait()
+
+    def stop(self):
+        with self._lock:
+            listeners = (self.keyboard_listener, self.mouse_listener)
+            self.keyboard_listener = self.mouse_listener = None
+        for listener in listeners:
+            if listener is not None:
+                listener.stop()
+
+    def subscribe(self, injected=False, **handlers):
+        """Registers handlers by event kind (press, release, click, move, scroll) and returns the Subscription."""
+        unknown = set(handlers) - set(KINDS)
+        if unknown:
+            raise TypeError(f"Unknown input event kinds: {', '.join(sorted(unknown))}")
+        subscription = Subscription(self, handlers, injected)
+        with self._lock:
+            self._subscriptions.append(subscription)
+            self._rebuild()
+        self.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+                self._rebuild()
+
+    def _rebuild(self):
+        dispatch = {kind: [] for kind in KINDS}
+        dispatch_injected = {kind: [] for kind in KINDS}
+        for subscription in self._subscriptions:
+            for kind, handler in subscription.handlers.items():
+                if handler is None:
+                    continue
+                dispatch[kind].append((subscription, handler))
+                if subscription.injected:
+                    dispatch_injected[kind].append((subscription, handler))
+        self._dispatch = {kind: tuple(entries) for kind, entries in dispatch.items()}
+        self._dispatch_injected = {kind: tuple(entries) for kind, entries in dispatch_injected.items()}
+
+    def _emit(self, kind, args, injected):
+        for subscription, handler in (self._dispatch_injected if injected else self._dispatch)[kind]:
+            result = handler(*args, injected) if subscription.injected else handler(*args)
+            if result is False:
+                self.unsubscribe(subscription)
+
+    def _on_press(self, key, injected=False):
+        self._emit('press', (key,), injected)
+
+    def _on_release(self, key, injected=False):
+        self._emit('release', (key,), injected)
+
+    def _on_click(self, x, y, button, pressed, injected=False):
+        self._emit('click', (x, y, button, pressed), injected)
+
+    def _on_move(self, x, y, injected=False):
+        self._emit('move', (x, y), injected)
+
+    def _on_scroll(self, x, y, dx, dy, injected=False):
+        self._emit('scroll', (x, y, dx, dy), injected)
+
+_hub = None
+_hub_lock = threading.Lock()
+
+# Returns the process-wide hub, creating it on first use.
+def get_hub():
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = InputHub()
+        return _hub
@@ -0,0 +1,149 @@
+# loopback.py
+"""Recognizes the key events this process injected itself, and measures their round trip.
+
+pynput 1.8+ passes an `injected` flag to listener callbacks where the platform
+reports one. As a fallback (and for timing), a TaggedBackend records every key
+it injects in an InjectionLedger; a listener that observes the same key event
+within MAX_AGE_S consumes the entry and treats the event as its own.
+"""
+import collections
+import threading
+import time
+
+from backend import ActionExecutor
+from hotkeys import hotkey_token
+from inputs import get_hub
+from metrics import Histogram
+from outputs import OutputBackend, create_backend
+
+MAX_AGE_S = 1.0
+MAX_PENDING = 1024  # Per key and direction; older entries are dropped first
+
+class InjectionLedger:
+    """Injection timestamps per (kind, key token), shared by the output and listener threads."""
+    def __init__(self, max_age_s=MAX_AGE_S, max_pending=MAX_PENDING):
+        self.max_age_ns = int(max_age_s * 1_000_000_000)
+        self.max_pending = max_pending
+        self._pending = {}
+
+    def record(self, kind, token):
+        queue = self._pending.get((kind, token))
+        if queue is None:
+            queue = self._pending.setdefault((kind, token), collections.deque(maxlen=self.max_pending))
+        queue.append(time.perf_counter_ns())
+
+    def consume(self, kind, token):
+        """Returns the injection time of the oldest unexpired matching event, or None if there is none."""
+        queue = self._pending.get((kind, token))
+        if not queue:
+            return None
+        oldest_valid = time.perf_counter_ns() - self.max_age_ns
+        while True:
+            try:
+                stamp = queue.popleft()
+            except IndexError:
+                return None
+            if stamp >= oldest_valid:
+                return stamp
+
+class TaggedBackend(OutputBackend):
+    """Wraps another backend and records each key press and release in a ledger before injecting it."""
+    def __init__(self, inner, ledger):
+        self.inner = inner
+        self.ledger = ledger
+        self.name = inner.name
+        self._tokens = {}
+        # Mouse output is never matched against hotkeys, so it goes straight through
+        self.move = inner.move
+        self.click = inner.click
+        self.mouse_down = inner.mouse_down
+        self.mouse_up = inner.mouse_up
+        self.scroll = inner.scroll
+        self.flush = inner.flush
+        self.close = inner.close
+        self._press = inner.press
+        self._release = inner.release
+
+    def _token(self, key):
+        token = self._tokens.get(key)
+        if token is None:
+            token = self._tokens[key] = hotkey_token(key)
+        return token
+
+    def press(self, key):
+        self.ledger.record('press', self._token(key))
+        self._press(key)
+
+    def release(self, key):
+        self.ledger.record('release', self._token(key))
+        self._release(key)
+
+class LatencyProbe:
+    """Runs an ActionExecutor tapping `key` and listens for its events to measure loopback latency.
+
+    The executor injects through a TaggedBackend, so every press it sends is
+    stamped in the ledger exactly as in a normal run. Reports the
+    injection-to-observation latency histogram, how many events never came back
+    (dropped), and how many arrived with pynput's injected flag.
+    """
+    def __init__(self, backend, key=None, count=200, rate_hz=50.0, settle_s=0.5, hub=None):
+        from pynput import keyboard
+        self.hub = hub if hub is not None else get_hub()
+        self.ledger = InjectionLedger()
+        self.backend = TaggedBackend(backend, self.ledger)
+        self.key = key if key is not None else keyboard.Key.shift
+        self.token = hotkey_token(self.key)
+        self.count = count
+        self.period_s = 1.0 / rate_hz
+        self.settle_s = settle_s
+        self.latency = Histogram()
+        self.injected = 0
+        self.observed = 0
+        self.flagged = 0
+        self._lock = threading.Lock()
+
+    def on_press(self, key, injected=False):
+        now = time.perf_counter_ns()
+        token = hotkey_token(key)
+        if token != self.token:
+            return
+        stamp = self.ledger.consume('press', token)
+        if stamp is None:
+            return  # A real key press, or one that arrived after MAX_AGE_S
+        with self._lock:
+            self.latency.record_ns(now - stamp)
+            self.observed += 1
+            self.flagged += bool(injected)
+
+    def run(self):
+        subscription = self.hub.subscribe(press=self.on_press, injected=True)
+        try:
+            executor = ActionExecutor(self.period_s, self.count,
+                                      [{'type': 'press', 'key': self.key}, {'type': 'release', 'key': self.key}],
+                                      backend=self.backend)
+            executor.start()
+            executor.join()
+            self.injected = executor.actions_done
+            time.sleep(self.settle_s)
+        finally:
+            subscription.cancel()
+        return self.report()
+
+    def report(self):
+        with self._lock:
+            return {
+                "backend": self.backend.name,
+                "injected": self.injected,
+                "observed": self.observed,
+                "dropped": self.injected - self.observed,
+                "flagged_injected": self.flagged,
+                "latency": self.latency.snapshot(),
+            }
+
+# Probes one output backend by name ('pynput' or 'xtest') through an ActionExecutor and returns its report.
+def probe_backend(name, count=200, rate_hz=50.0):
+    backend = create_backend(name)
+    try:
+        return LatencyProbe(backend, count=count, rate_hz=rate_hz).run()
+    finally:
+        backend.close()
@@ -0,0 +1,199 @@
+# macrofile.py
+"""Versioned fixed-record binary macro format.
+
+Layout:
+    header      HEADER struct (magic, version, record count, section offsets)
+    records     RECORD structs, one per event, delta-time encoded
+    index       INDEX_ENTRY structs every `index_stride` records (record number, absolute time)
+    key table   newline-separated serialize_key() strings; a record's code is its 1-based position
+
+Records are never materialized up front: the reader memory-maps the file and
+unpacks them lazily, so even million-event macros open instantly.
+"""
+import bisect
+import mmap
+import struct
+
+from utils import serialize_key, deserialize_key
+
+MAGIC = b"ACMF"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQQQI4x")  # magic, version, flags, count, index offset, key table offset, index stride
+RECORD = struct.Struct("<BxxxIiiI")   # opcode, code, x, y, delta time (us)
+INDEX_ENTRY = struct.Struct("<QQ")    # record number, absolute time (us)
+DEFAULT_INDEX_STRIDE = 1024
+MAX_DELTA_US = 0xFFFFFFFF
+
+OP_MOVE = 1
+OP_MOUSE_DOWN = 2
+OP_MOUSE_UP = 3
+OP_SCROLL = 4
+OP_PRESS = 5
+OP_RELEASE = 6
+
+OPCODES = {'move': OP_MOVE, 'mouse_down': OP_MOUSE_DOWN, 'mouse_up': OP_MOUSE_UP,
+           'scroll': OP_SCROLL, 'press': OP_PRESS, 'release': OP_RELEASE}
+
+class MacroFileError(ValueError):
+    pass
+
+class MacroFileWriter:
+    """Streams (t_ns, kind, data) events from MacroRecorder into the binary format."""
+    def __init__(self, path, index_stride=DEFAULT_INDEX_STRIDE):
+        self.file = open(path, "wb")
+        self.index_stride = index_stride
+        self.count = 0
+        self.last_us = 0
+        self.index = []
+        self.key_codes = {}
+        self.file.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0, 0, index_stride))
+
+    def _code(self, key):
+        name = serialize_key(key)
+        code = self.key_codes.get(name)
+        if code is None:
+            code = self.key_codes[name] = len(self.key_codes) + 1
+        return code
+
+    def write_chunk(self, events):
+        buffer = bytearray(RECORD.size * len(events))
+        offset = 0
+        for t_ns, kind, data in events:
+            t_us = t_ns // 1000
+            if self.count % self.index_stride == 0:
+                self.index.append((self.count, t_us))
+            delta = min(MAX_DELTA_US, max(0, t_us - self.last_us))
+            self.last_us = t_us
+            x, y = data.get('delta') or data.get('pos') or (0, 0)
+            key = data.get('key', data.get('button'))
+            code = self._code(key) if key is not None else 0
+            RECORD.pack_into(buffer, offset, OPCODES[kind], code, int(x), int(y), delta)
+            offset += RECORD.size
+            self.count += 1
+        self.file.write(buffer)
+
+    def close(self):
+        index_offset = self.file.tell()
+        for entry in self.index:
+            self.file.write(INDEX_ENTRY.pack(*entry))
+        key_table_offset = self.file.tell()
+        names = sorted(self.key_codes, key=self.key_codes.get)
+        self.file.write("\n".join(names).encode("utf-8"))
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, 0, self.count, index_offset, key_table_offset, self.index_stride))
+        self.file.close()
+
+class MacroFile:
+    """Read-only, memory-mapped view of a binary macro."""
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            raise MacroFileError(f"{path} is too small to be a macro file")
+        magic, version, _, count, index_offset, key_table_offset, stride = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise MacroFileError(f"{path} is not a macro file")
+        if version != VERSION:
+            raise MacroFileError(f"Unsupported macro file version: {version}")
+        self.count = count
+        self.index_stride = stride
+        self._index_offset = index_offset
+        self._key_table_offset = key_table_offset
+        index = [INDEX_ENTRY.unpack_from(self._map, index_offset + i * INDEX_ENTRY.size)
+                 for i in range((key_table_offset - index_offset) // INDEX_ENTRY.size)]
+        self._index_records = [entry[0] for entry in index]
+        self._index_times = [entry[1] for entry in index]
+        self._keys = None
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def keys(self):
+        """The decoded key table; index 0 is reserved for records without a key."""
+        if self._keys is None:
+            table = bytes(self._map[self._key_table_offset:]).decode("utf-8")
+            self._keys = [None] + [deserialize_key(name) for name in table.split("\n") if name]
+        return self._keys
+
+    def records(self, start=0):
+        """Lazily yields (opcode, code, x, y, delta_us) tuples starting at record `start`."""
+        begin = HEADER.size + start * RECORD.size
+        end = HEADER.size + self.count * RECORD.size
+        view = memoryview(self._map)[begin:end]
+        try:
+            for opcode, code, x, y, delta in RECORD.iter_unpack(view):
+                yield opcode, code, x, y, delta
+        finally:
+            view.release()
+
+    def locate(self, t_us):
+        """Returns (record number, absolute time of the record before it) for the first record at or after t_us."""
+        slot = bisect.bisect_right(self._index_times, t_us) - 1
+        if slot < 0:
+            return 0, 0
+        record, t = self._index_records[slot], self._index_times[slot]
+        # The indexed time already includes that record's own delta
+        t -= RECORD.unpack_from(self._map, HEADER.size + record * RECORD.size)[-1]
+        for opcode, code, x, y, delta in self.records(record):
+            if t + delta >= t_us:
+                break
+            t += delta
+            record += 1
+        return record, t
+
+    def close(self):
+        self._map.close()
+
+# Collects the seconds between successive presses and clicks, e.g. as samples for TimingProfile("human").
+def press_intervals(macro):
+    intervals = []
+    t_us = 0
+    last_press_us = None
+    for opcode, code, x, y, delta in macro.records():
+        t_us += delta
+        if opcode in (OP_PRESS, OP_MOUSE_DOWN):
+            if last_press_us is not None:
+                intervals.append((t_us - last_press_us) / 1_000_000)
+            last_press_us = t_us
+    return intervals
+
+class MacroPlayback:
+    """A MacroFile's records as timed actions, played by ActionExecutor(macro=...).
+
+    A speed of 2.0 plays twice as fast; `loops` of 0 repeats until stopped.
+    """
+    def __init__(self, macro, speed=1.0, loops=1, start_us=0):
+        self.macro = macro if isinstance(macro, MacroFile) else MacroFile(macro)
+        self.speed = speed if speed > 0 else 1.0
+        self.loops = loops
+        self.start_us = start_us
+
+    def bind(self, backend):
+        """Resolves each opcode to a callable(code, x, y) on the given output backend."""
+        keys = self.macro.keys
+        return {
+            OP_MOVE: lambda code, x, y: backend.move((x, y)),
+            OP_MOUSE_DOWN: lambda code, x, y: backend.mouse_down(keys[code]),
+            OP_MOUSE_UP: lambda code, x, y: backend.mouse_up(keys[code]),
+            OP_SCROLL: lambda code, x, y: backend.scroll(x, y),
+            OP_PRESS: lambda code, x, y: backend.press(keys[code]),
+            OP_RELEASE: lambda code, x, y: backend.release(keys[code]),
+        }
+
+    def timeline(self):
+        """Lazily yields (t_ns, opcode, code, x, y), t_ns counted from the start of playback across loops."""
+        if not self.macro.count:
+            return
+        ns_per_us = 1000 / self.speed
+        start, t_us = self.macro.locate(self.start_us)
+        base_us = -t_us
+        loop = 0
+        while self.loops <= 0 or loop < self.loops:
+            for opcode, code, x, y, delta in self.macro.records(start):
+                t_us += delta
+                yield int((base_us + t_us) * ns_per_us), opcode, code, x, y
+            base_us += t_us
+            start, t_us = 0, 0
+            loop += 1
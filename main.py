@@ -1,6 +1,27 @@
 # main.py
-from gui import App
+import sys
 
 if __name__ == "__main__":
-    app = App()
-    app.mainloop()
\ No newline at end of file
+    if "--headless" in sys.argv[1:]:
+        # The headless path never imports customtkinter
+        import headless
+        headless.main([arg for arg in sys.argv[1:] if arg != "--headless"])
+    elif "--fleet" in sys.argv[1:]:
+        import fleet
+        fleet.main([arg for arg in sys.argv[1:] if arg != "--fleet"])
+    elif "--startup-report" in sys.argv[1:]:
+        import startup
+        startup.timed_import("customtkinter")
+        startup.timed_import("pynput")
+        from gui import App
+        startup.mark("import gui")
+        app = App()
+        startup.mark("build window")
+        app.update()  # Maps the window and draws the first frame
+        startup.mark("first frame")
+        print(startup.report())
+        app.on_closing()
+    else:
+        from gui import App
+        app = App()
+        app.mainloop()
@@ -0,0 +1,106 @@
+# metrics.py
+import bisect
+import csv
+import json
+import time
+
+# Upper bucket bounds in microseconds, spaced 10% apart from 10 us to about 60 s.
+BUCKET_BOUNDS_US = tuple(sorted({int(10 * 1.1 ** i) for i in range(165)}))
+
+class Histogram:
+    """Fixed-bucket histogram; recording is a bisect and an integer increment."""
+    def __init__(self, bounds_us=BUCKET_BOUNDS_US):
+        self.bounds_us = bounds_us
+        self.counts = [0] * (len(bounds_us) + 1)  # The last bucket catches overflow
+        self.total = 0
+        self.sum_us = 0
+
+    def record_ns(self, value_ns):
+        value_us = value_ns // 1000
+        self.counts[bisect.bisect_left(self.bounds_us, value_us)] += 1
+        self.total += 1
+        self.sum_us += value_us
+
+    def percentile(self, pct):
+        """Returns the upper bound (in ms) of the bucket holding the given percentile."""
+        if not self.total:
+            return 0.0
+        rank = pct / 100.0 * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                bound = self.bounds_us[i] if i < len(self.bounds_us) else self.bounds_us[-1]
+                return bound / 1000.0
+        return self.bounds_us[-1] / 1000.0
+
+    def mean(self):
+        return self.sum_us / self.total / 1000.0 if self.total else 0.0
+
+    def snapshot(self):
+        return {
+            "count": self.total,
+            "mean_ms": self.mean(),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "buckets_us": dict(zip([str(b) for b in self.bounds_us] + ["inf"], self.counts)),
+        }
+
+class ExecutorMetrics:
+    """Counters the executor updates from its own thread and the GUI reads without locking."""
+    def __init__(self, ewma_alpha=0.1):
+        self.ewma_alpha = ewma_alpha
+        self.intervals = Histogram()
+        self.injections = Histogram()
+        self.missed_deadlines = 0
+        self.actions = 0
+        self.ewma_interval_ns = 0.0
+        self.last_action_ns = 0
+        self.started_at = time.time()
+
+    def record_action(self, start_ns, end_ns, count=1):
+        """Records `count` actions injected together between start_ns and end_ns."""
+        if self.last_action_ns:
+            interval = (start_ns - self.last_action_ns) // count
+            self.intervals.record_ns(interval)
+            if self.ewma_interval_ns:
+                self.ewma_interval_ns += self.ewma_alpha * (interval - self.ewma_interval_ns)
+            else:
+                self.ewma_interval_ns = float(interval)
+        self.last_action_ns = start_ns
+        self.injections.record_ns(end_ns - start_ns)
+        self.actions += count
+
+    @property
+    def actual_cps(self):
+        return 1e9 / self.ewma_interval_ns if self.ewma_interval_ns else 0.0
+
+    def snapshot(self):
+        return {
+            "started_at": self.started_at,
+            "actions": self.actions,
+            "actual_cps": self.actual_cps,
+            "missed_deadlines": self.missed_deadlines,
+            "interval": self.intervals.snapshot(),
+            "injection": self.injections.snapshot(),
+        }
+
+# Writes a metrics snapshot to `path`, as CSV if the name ends in .csv and JSON otherwise.
+def export_snapshot(snapshot, path):
+    if path.lower().endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["metric", "value"])
+            for key in ("started_at", "actions", "actual_cps", "missed_deadlines"):
+                writer.writerow([key, snapshot[key]])
+            for name in ("interval", "injection"):
+                for key, value in snapshot[name].items():
+                    if key == "buckets_us":
+                        for bound, count in value.items():
+                            writer.writerow([f"{name}.bucket_le_{bound}us", count])
+                    else:
+                        writer.writerow([f"{name}.{key}", value])
+    else:
+        with open(path, "w") as f:
+            json.dump(snapshot, f, indent=2)
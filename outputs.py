@@ -0,0 +1,165 @@
+# outputs.py
+import time
+
+class OutputBackend:
+    """Delivers compiled ops to the OS. Calls may be buffered until flush()."""
+    name = "base"
+
+    def move(self, pos):
+        raise NotImplementedError
+
+    def click(self, button, count=1):
+        raise NotImplementedError
+
+    def mouse_down(self, button):
+        raise NotImplementedError
+
+    def mouse_up(self, button):
+        raise NotImplementedError
+
+    def scroll(self, dx, dy):
+        raise NotImplementedError
+
+    def press(self, key):
+        raise NotImplementedError
+
+    def release(self, key):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+class PynputBackend(OutputBackend):
+    """The original behaviour: every event is its own pynput call."""
+    name = "pynput"
+
+    def __init__(self):
+        from pynput import mouse, keyboard
+        self.mouse = mouse.Controller()
+        self.keyboard = keyboard.Controller()
+        self.click = self.mouse.click
+        self.mouse_down = self.mouse.press
+        self.mouse_up = self.mouse.release
+        self.scroll = self.mouse.scroll
+        self.press = self.keyboard.press
+        self.release = self.keyboard.release
+
+    def move(self, pos):
+        self.mouse.position = pos
+
+class XTestBackend(OutputBackend):
+    """Queues XTest requests on one X connection and sends a whole iteration with a single flush."""
+    name = "xtest"
+
+    def __init__(self, display_name=None):
+        try:
+            from Xlib import X, XK, display
+            from Xlib.ext import xtest
+        except ImportError as e:
+            raise RuntimeError("The xtest backend requires python-xlib") from e
+        self._X = X
+        self._XK = XK
+        self._fake_input = xtest.fake_input
+        self.display = display.Display(display_name)
+        if not self.display.has_extension('XTEST'):
+            raise RuntimeError("The X server does not support the XTEST extension")
+        self._keycodes = {}
+
+    def _keycode(self, key):
+        # Resolved once per key; pynput Key values carry the X keysym as vk on xorg.
+        code = self._keycodes.get(key)
+        if code is None:
+            value = getattr(key, 'value', key)
+            keysym = getattr(value, 'vk', None)
+            if keysym is None:
+                char = getattr(value, 'char', None) or str(value)
+                keysym = self._XK.string_to_keysym(char) or ord(char[0])
+            code = self.display.keysym_to_keycode(keysym)
+            self._keycodes[key] = code
+        return code
+
+    def move(self, pos):
+        self._fake_input(self.display, self._X.MotionNotify, x=int(pos[0]), y=int(pos[1]))
+
+    def click(self, button, count=1):
+        detail = getattr(button, 'value', button)
+        for _ in range(count):
+            self._fake_input(self.display, self._X.ButtonPress, detail)
+            self._fake_input(self.display, self._X.ButtonRelease, detail)
+
+    def mouse_down(self, button):
+        self._fake_input(self.display, self._X.ButtonPress, getattr(button, 'value', button))
+
+    def mouse_up(self, button):
+        self._fake_input(self.display, self._X.ButtonRelease, getattr(button, 'value', button))
+
+    def scroll(self, dx, dy):
+        # X11 reports wheel motion as buttons 4/5 (vertical) and 6/7 (horizontal)
+        for amount, negative, positive in ((dy, 5, 4), (dx, 6, 7)):
+            detail = positive if amount > 0 else negative
+            for _ in range(abs(int(amount))):
+                self._fake_input(self.display, self._X.ButtonPress, detail)
+                self._fake_input(self.display, self._X.ButtonRelease, detail)
+
+    def press(self, key):
+        self._fake_input(self.display, self._X.KeyPress, self._keycode(key))
+
+    def release(self, key):
+        self._fake_input(self.display, self._X.KeyRelease, self._keycode(key))
+
+    def flush(self):
+        self.display.flush()
+
+    def close(self):
+        self.display.close()
+
+class NullBackend(OutputBackend):
+    """Records every op with a perf_counter_ns timestamp instead of touching the OS."""
+    name = "null"
+
+    def __init__(self):
+        self.events = []
+        self.flushes = 0
+
+    def move(self, pos):
+        self.events.append((time.perf_counter_ns(), 'move', pos))
+
+    def click(self, button, count=1):
+        now = time.perf_counter_ns()
+        for _ in range(count):
+            self.events.append((now, 'click', button))
+
+    def mouse_down(self, button):
+        self.events.append((time.perf_counter_ns(), 'mouse_down', button))
+
+    def mouse_up(self, button):
+        self.events.append((time.perf_counter_ns(), 'mouse_up', button))
+
+    def scroll(self, dx, dy):
+        self.events.append((time.perf_counter_ns(), 'scroll', (dx, dy)))
+
+    def press(self, key):
+        self.events.append((time.perf_counter_ns(), 'press', key))
+
+    def release(self, key):
+        self.events.append((time.perf_counter_ns(), 'release', key))
+
+    def flush(self):
+        self.flushes += 1
+
+    def clear(self):
+        self.events.clear()
+        self.flushes = 0
+
+BACKENDS = {backend.name: backend for backend in (PynputBackend, XTestBackend, NullBackend)}
+
+# Creates an output backend from its name ('pynput', 'xtest' or 'null').
+def create_backend(name="pynput", **kwargs):
+    try:
+        backend_cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown output backend: {name}") from None
+    return backend_cls(**kwargs)
@@ -0,0 +1,93 @@
+# paths.py
+import itertools
+import json
+import math
+import random
+
+ORDERS = ("sequence", "random", "route")
+
+# Reads points from a JSON list of [x, y] pairs or a text file with one "x,y" per line.
+def load_points(path):
+    with open(path) as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = [line.replace(";", ",").split(",") for line in text.splitlines() if line.strip()]
+    return [(int(float(x)), int(float(y))) for x, y in data]
+
+def save_points(path, points):
+    with open(path, "w") as f:
+        json.dump([list(p) for p in points], f)
+
+def route_length(points):
+    return sum(math.dist(points[i - 1], points[i]) for i in range(len(points)))
+
+# Orders points into a short closed tour: nearest-neighbour construction, then 2-opt.
+def plan_route(points, max_passes=50):
+    points = list(points)
+    if len(points) < 4:
+        return points
+    n = len(points)
+    dist = [[math.dist(a, b) for b in points] for a in points]
+
+    unvisited = set(range(1, n))
+    tour = [0]
+    while unvisited:
+        last = dist[tour[-1]]
+        nearest = min(unvisited, key=last.__getitem__)
+        unvisited.remove(nearest)
+        tour.append(nearest)
+
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, n - 1):
+            a, b = tour[i - 1], tour[i]
+            dist_a, dist_ab = dist[a], dist[a][b]
+            for j in range(i + 1, n):
+                c, d = tour[j], tour[(j + 1) % n]
+                # Reversing tour[i..j] swaps edges (a,b),(c,d) for (a,c),(b,d)
+                if dist_a[c] + dist[b][d] < dist_ab + dist[c][d] - 1e-9:
+                    tour[i:j + 1] = reversed(tour[i:j + 1])
+                    b = tour[i]
+                    dist_ab = dist_a[b]
+                    improved = True
+        if not improved:
+            break
+    return [points[i] for i in tour]
+
+class ClickPath:
+    """A list of target points visited one per action.
+
+    The visiting order is fixed when the path is built: "sequence" keeps the
+    given order, "route" plans a short tour once, and "random" draws a fresh
+    permutation per pass (seeded, so runs can be repeated). next_pos() is then
+    just an iterator step.
+    """
+    def __init__(self, points, order="sequence", seed=None):
+        if order not in ORDERS:
+            raise ValueError(f"Unknown path order: {order}")
+        points = [tuple(int(v) for v in p) for p in points]
+        if not points:
+            raise ValueError("A click path needs at least one point")
+        self.order = order
+        self.seed = seed
+        self.points = tuple(plan_route(points) if order == "route" else points)
+        if order == "random":
+            self._iter = self._random_passes()
+        else:
+            self._iter = itertools.cycle(self.points)
+        self.next_pos = self._iter.__next__
+
+    def _random_passes(self):
+        rng = random.Random(self.seed)
+        order = list(self.points)
+        while True:
+            rng.shuffle(order)
+            yield from order
+
+    def __len__(self):
+        return len(self.points)
+
+    def to_dict(self):
+        return {'points': [list(p) for p in self.points], 'order': self.order, 'seed': self.seed}
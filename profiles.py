@@ -0,0 +1,127 @@
+# profiles.py
+import json
+import os
+import re
+from pynput import mouse
+
+from paths import ClickPath
+from timing import TimingProfile
+from utils import serialize_key, deserialize_key, serialize_sequence, deserialize_sequence
+
+DEFAULT_PROFILE_DIR = os.path.join(os.path.expanduser("~"), ".autoclicker", "profiles")
+INDEX_FILE = "index.json"
+
+def serialize_settings(settings):
+    data = dict(settings)
+    if data.get('custom_key_action') is not None:
+        data['custom_key_action'] = serialize_sequence(data['custom_key_action'])
+    if data.get('click_pos') is not None:
+        data['click_pos'] = list(data['click_pos'])
+    return data
+
+def deserialize_settings(data):
+    settings = dict(data)
+    if settings.get('custom_key_action') is not None:
+        settings['custom_key_action'] = deserialize_sequence(settings['custom_key_action'])
+    if settings.get('click_pos') is not None:
+        settings['click_pos'] = tuple(settings['click_pos'])
+    return settings
+
+MOUSE_TARGETS = {"Left": mouse.Button.left, "Middle": mouse.Button.middle, "Right": mouse.Button.right}
+
+# Builds the executor's action sequence from a settings dict's target.
+def build_action_sequence(settings):
+    target = settings.get('target', "Left")
+    button = MOUSE_TARGETS.get(target)
+    if button is not None:
+        return [{'type': 'click', 'button': button}]
+    if target == "Text":
+        return [{'type': 'type', 'text': build_text_source(settings)}]
+    return settings['custom_key_action']
+
+# Builds the TextSource for the "Text" target from 'text' (a template) or 'text_file'.
+def build_text_source(settings):
+    from text import TextSource, load_text
+    template = load_text(settings['text_file']) if settings.get('text_file') else settings.get('text', "")
+    return TextSource(template, settings.get('seed'))
+
+# Returns what the executor should click at: a ClickPath, a fixed point or None (current position).
+def build_click_target(settings):
+    path = settings.get('click_path')
+    if path:
+        return ClickPath(path['points'], path.get('order', "sequence"), path.get('seed'))
+    return settings.get('click_pos')
+
+# Builds the TimingProfile for a settings dict; the human distribution samples a recorded macro.
+def build_timing(settings):
+    distribution = settings.get('distribution', "uniform")
+    samples = None
+    if distribution == "human":
+        from macrofile import MacroFile, press_intervals
+        samples = press_intervals(MacroFile(settings['timing_macro']))
+    return TimingProfile(settings.get('random_ms', 0) / 1000.0, distribution, settings.get('seed'), samples)
+
+class ProfileStore:
+    """Saved run settings, one JSON file per profile.
+
+    Only the small index (profile name -> hotkey) is read up front; a profile's
+    settings are loaded from disk the first time they are needed and then cached.
+    """
+    def __init__(self, directory=DEFAULT_PROFILE_DIR):
+        self.directory = directory
+        self._hotkeys = None
+        self._cache = {}
+
+    def _path(self, name):
+        safe_name = re.sub(r"[^\w\- ]", "_", name)
+        return os.path.join(self.directory, f"{safe_name}.json")
+
+    def _load_index(self):
+        if self._hotkeys is None:
+            try:
+                with open(os.path.join(self.directory, INDEX_FILE)) as f:
+                    raw = json.load(f)
+            except (OSError, ValueError):
+                raw = {}
+            self._hotkeys = {name: {deserialize_key(k) for k in keys} for name, keys in raw.items()}
+        return self._hotkeys
+
+    def _save_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        raw = {name: sorted(serialize_key(k) for k in keys) for name, keys in self._hotkeys.items()}
+        with open(os.path.join(self.directory, INDEX_FILE), "w") as f:
+            json.dump(raw, f, indent=2)
+
+    def names(self):
+        return sorted(self._load_index())
+
+    def hotkeys(self):
+        """Returns {profile name: set of pynput keys} for every saved profile."""
+        return dict(self._load_index())
+
+    def load(self, name):
+        settings = self._cache.get(name)
+        if settings is None:
+            with open(self._path(name)) as f:
+                settings = deserialize_settings(json.load(f))
+            self._cache[name] = settings
+        return settings
+
+    def save(self, name, hotkey, settings):
+        self._load_index()
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(name), "w") as f:
+            json.dump(serialize_settings(settings), f, indent=2)
+        self._cache[name] = settings
+        self._hotkeys[name] = set(hotkey)
+        self._save_index()
+
+    def delete(self, name):
+        self._load_index()
+        self._hotkeys.pop(name, None)
+        self._cache.pop(name, None)
+        try:
+            os.remove(self._path(name))
+        except OSError:
+            pass
+        self._save_index()
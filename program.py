@@ -0,0 +1,106 @@
+# program.py
+from paths import ClickPath
+
+OP_MOVE = 0
+OP_CLICK = 1
+OP_PRESS = 2
+OP_RELEASE = 3
+OP_MOVE_PATH = 4
+OP_TYPE = 5
+
+OP_NAMES = {OP_MOVE: 'move', OP_CLICK: 'click', OP_PRESS: 'press', OP_RELEASE: 'release', OP_MOVE_PATH: 'move_path',
+            OP_TYPE: 'type'}
+_MOVE_OPS = (OP_MOVE, OP_MOVE_PATH)
+_EVENT_OPS = {'click': OP_CLICK, 'press': OP_PRESS, 'release': OP_RELEASE, 'type': OP_TYPE}
+_EVENT_ARGS = {OP_CLICK: 'button', OP_PRESS: 'key', OP_RELEASE: 'key', OP_TYPE: 'text'}
+
+class Op:
+    __slots__ = ('code', 'arg')
+
+    def __init__(self, code, arg):
+        self.code = code
+        self.arg = arg
+
+    def __repr__(self):
+        return f"Op({OP_NAMES[self.code]}, {self.arg!r})"
+
+class Program:
+    """An immutable, pre-validated form of an action sequence.
+
+    Built once before a run so the executor never inspects event dicts or
+    re-checks the click position inside its loop.
+    """
+    __slots__ = ('ops',)
+
+    def __init__(self, ops):
+        self.ops = tuple(ops)
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __iter__(self):
+        return iter(self.ops)
+
+    @property
+    def actions(self):
+        # Every op except the leading cursor move, which is an implementation detail.
+        return tuple(op for op in self.ops if op.code not in _MOVE_OPS)
+
+    def single_click(self):
+        """Returns (position or None, button) if the program is one click, so it can be batched."""
+        actions = self.actions
+        if len(actions) != 1 or actions[0].code != OP_CLICK or self.ops[0].code == OP_MOVE_PATH:
+            return None
+        pos = self.ops[0].arg if self.ops[0].code == OP_MOVE else None
+        return pos, actions[0].arg
+
+    def bind(self, backend):
+        """Resolves each op to a (callable, argument) pair for the given output backend."""
+        move = backend.move
+        press = backend.press
+        release = backend.release
+
+        def type_char(next_steps):
+            # One character's cached key steps, e.g. shift down, key down, key up, shift up
+            for is_press, key in next_steps():
+                if is_press:
+                    press(key)
+                else:
+                    release(key)
+
+        handlers = {
+            OP_MOVE: move,
+            OP_MOVE_PATH: lambda next_pos: move(next_pos()),
+            OP_CLICK: backend.click,
+            OP_PRESS: press,
+            OP_RELEASE: release,
+            OP_TYPE: type_char,
+        }
+        return tuple((handlers[op.code], _bound_arg(op)) for op in self.ops)
+
+def _bound_arg(op):
+    if op.code == OP_MOVE_PATH:
+        return op.arg.next_pos
+    if op.code == OP_TYPE:
+        return op.arg.next_steps
+    return op.arg
+
+# Compiles a list of event dicts (from the GUI or ActionRecorder) into a Program.
+# A {'type': 'type', 'text': TextSource} event types the next character of the text per iteration.
+# `click_pos` is a single (x, y) point or a ClickPath visited one point per iteration.
+def compile_sequence(sequence, click_pos=None):
+    if isinstance(sequence, Program):
+        return sequence
+    ops = []
+    for event in sequence:
+        code = _EVENT_OPS.get(event['type'])
+        if code is None:
+            raise ValueError(f"Unknown action type: {event['type']}")
+        ops.append(Op(code, event[_EVENT_ARGS[code]]))
+    # One cursor move per iteration replaces the per-click position assignment
+    if click_pos and any(op.code == OP_CLICK for op in ops):
+        if isinstance(click_pos, ClickPath):
+            ops.insert(0, Op(OP_MOVE_PATH, click_pos))
+        else:
+            ops.insert(0, Op(OP_MOVE, tuple(click_pos)))
+    return Program(ops)
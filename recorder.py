@@ -1,33 +1,45 @@
 # recorder.py
+import json
+import queue
 import threading
+import time
 from pynput import mouse, keyboard
 
-class ActionRecorder(threading.Thread):
-    def __init__(self, callback, hotkey_mode=False, restrict_mouse=False):
-        super().__init__()
+from inputs import get_hub
+from macrofile import MacroFileWriter
+from utils import serialize_key
+
+MACRO_EXTENSION = ".acm"
+
+MODIFIER_NAMES = ('shift', 'ctrl', 'alt')
+
+def is_modifier(key):
+    return isinstance(key, keyboard.Key) and any(mod in key.name for mod in MODIFIER_NAMES)
+
+class ActionRecorder:
+    def __init__(self, callback, hotkey_mode=False, restrict_mouse=False, hub=None):
         self.callback = callback
         self.hotkey_mode = hotkey_mode
         self.restrict_mouse = restrict_mouse
+        self.hub = hub
         
         self.events = []
         self.pressed_keys = set()
+        self.has_main_key = False
         
-        self.mouse_listener = None
-        self.keyboard_listener = None
+        self.subscription = None
         self.ignore_first_mouseup = True
-        self.daemon = True
 
-    def run(self):
-        self.mouse_listener = mouse.Listener(on_click=self.on_click)
-        self.keyboard_listener = keyboard.Listener(on_press=self.on_press, on_release=self.on_release)
-        self.mouse_listener.start()
-        self.keyboard_listener.start()
+    def start(self):
+        # The shared hooks are already running, so recording begins immediately
+        if self.hub is None:
+            self.hub = get_hub()
+        self.subscription = self.hub.subscribe(click=self.on_click, press=self.on_press, release=self.on_release)
 
     def stop_listeners(self):
-        if self.mouse_listener:
-            self.mouse_listener.stop()
-        if self.keyboard_listener:
-            self.keyboard_listener.stop()
+        if self.subscription is not None:
+            self.subscription.cancel()
+            self.subscription = None
         
         # Return the set of pressed keys for hotkey mode
         if self.hotkey_mode:
@@ -54,6 +66,8 @@ class ActionRecorder(threading.Thread):
         self.pressed_keys.add(key)
         if not self.hotkey_mode:
             self.events.append({'type': 'press', 'key': key})
+            if not is_modifier(key):
+                self.has_main_key = True
 
     def on_release(self, key):
         if self.hotkey_mode:
@@ -63,13 +77,125 @@ class ActionRecorder(threading.Thread):
         
         # Standard custom key recording logic
         self.events.append({'type': 'release', 'key': key})
-        is_modifier = isinstance(key, keyboard.Key) and any(mod in key.name for mod in ['shift', 'ctrl', 'alt'])
-        
-        has_main_key = any(
-            'key' in e and not (isinstance(e.get('key'), keyboard.Key) and any(mod in e['key'].name for mod in ['shift', 'ctrl', 'alt']))
-            for e in self.events if e['type'] == 'press'
-        )
 
-        if not is_modifier or (is_modifier and not has_main_key):
+        if not is_modifier(key) or not self.has_main_key:
             self.stop_listeners()
-            return False
\ No newline at end of file
+            return False
+
+class JsonLinesMacroWriter:
+    """Writes macro events as one JSON object per line."""
+    def __init__(self, path):
+        self.file = open(path, "w")
+
+    def write_chunk(self, events):
+        lines = []
+        for t_ns, kind, data in events:
+            record = {'t': t_ns, 'type': kind}
+            record.update(data)
+            for field in ('key', 'button'):
+                if field in record:
+                    record[field] = serialize_key(record[field])
+            lines.append(json.dumps(record))
+        self.file.write("\n".join(lines) + "\n")
+
+    def close(self):
+        self.file.close()
+
+class MacroRecorder:
+    """Records an unlimited session of mouse and keyboard events with monotonic timestamps.
+
+    Input hub callbacks only append a tuple to the current chunk. Full chunks are
+    handed to a background writer thread, so memory stays constant and the input
+    hooks never wait on disk. The mouse and keyboard hooks run on separate
+    threads, so appends and chunk swaps share one lock.
+    """
+    CHUNK_SIZE = 4096
+
+    def __init__(self, path, stop_key=keyboard.Key.esc, record_moves=True, on_finished=None, writer=None, hub=None):
+        self.path = path
+        self.hub = hub
+        self.stop_key = stop_key
+        self.record_moves = record_moves
+        self.on_finished = on_finished
+        if writer is None:
+            writer = MacroFileWriter(path) if path.endswith(MACRO_EXTENSION) else JsonLinesMacroWriter(path)
+        self.writer = writer
+        self.event_count = 0
+        self.start_ns = 0
+        self.recording = False
+        self._chunk = []
+        self._chunks = queue.SimpleQueue()
+        self._writer_thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._lock = threading.Lock()
+        self.subscription = None
+
+    def start(self):
+        self.start_ns = time.perf_counter_ns()
+        self.recording = True
+        self._writer_thread.start()
+        if self.hub is None:
+            self.hub = get_hub()
+        self.subscription = self.hub.subscribe(move=self.on_move if self.record_moves else None,
+                                               click=self.on_click, scroll=self.on_scroll,
+                                               press=self.on_press, release=self.on_release)
+
+    def _record(self, kind, data):
+        with self._lock:
+            if not self.recording:
+                return  # Stopped while this event was on its way in
+            chunk = self._chunk
+            # Stamped under the lock so events from both hooks stay in time order
+            chunk.append((time.perf_counter_ns() - self.start_ns, kind, data))
+            self.event_count += 1
+            if len(chunk) >= self.CHUNK_SIZE:
+                self._chunks.put(chunk)
+                self._chunk = []
+
+    def _write_loop(self):
+        while True:
+            chunk = self._chunks.get()
+            if chunk is None:
+                break
+            self.writer.write_chunk(chunk)
+        self.writer.close()
+
+    def on_move(self, x, y):
+        if self.recording:
+            self._record('move', {'pos': (x, y)})
+
+    def on_click(self, x, y, button, pressed):
+        if self.recording:
+            self._record('mouse_down' if pressed else 'mouse_up', {'pos': (x, y), 'button': button})
+
+    def on_scroll(self, x, y, dx, dy):
+        if self.recording:
+            self._record('scroll', {'pos': (x, y), 'delta': (dx, dy)})
+
+    def on_press(self, key):
+        if not self.recording:
+            return
+        if key == self.stop_key:
+            # Stopping joins the writer, so do it off the input hook thread
+            threading.Thread(target=self.stop, daemon=True).start()
+            return False
+        self._record('press', {'key': key})
+
+    def on_release(self, key):
+        if self.recording and key != self.stop_key:
+            self._record('release', {'key': key})
+
+    def stop(self):
+        """Unsubscribes from input and waits for every buffered event to reach disk."""
+        with self._lock:
+            if not self.recording:
+                return
+            self.recording = False
+            chunk, self._chunk = self._chunk, []
+        if self.subscription is not None:
+            self.subscription.cancel()
+        if chunk:
+            self._chunks.put(chunk)
+        self._chunks.put(None)
+        self._writer_thread.join()
+        if self.on_finished:
+            self.on_finished(self.path, self.event_count)
@@ -0,0 +1,248 @@
+# screen.py
+"""Screen-region conditions that gate the action timeline.
+
+A ConditionMonitor samples regions from a pluggable ScreenSource at a fixed
+rate on its own thread and publishes one boolean. The executor only reads that
+boolean, so sampling never delays an action.
+
+Pixels are handled as BGRX bytes (4 per pixel, row-major), which is what X11
+returns for 24/32-bit visuals. Each sample first hashes the whole region; only
+if that changed are the per-tile hashes recomputed, and only changed tiles are
+re-evaluated.
+"""
+import threading
+import time
+import zlib
+
+BYTES_PER_PIXEL = 4
+DEFAULT_TILE = 16
+
+class ScreenSource:
+    def grab(self, x, y, width, height):
+        """Returns the region as BGRX bytes, width * 4 bytes per row."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class X11Source(ScreenSource):
+    def __init__(self, display_name=None):
+        try:
+            from Xlib import X, display
+        except ImportError as e:
+            raise RuntimeError("The x11 screen source requires python-xlib") from e
+        self._zpixmap = X.ZPixmap
+        self.display = display.Display(display_name)
+        self.root = self.display.screen().root
+
+    def grab(self, x, y, width, height):
+        return self.root.get_image(x, y, width, height, self._zpixmap, 0xFFFFFFFF).data
+
+    def close(self):
+        self.display.close()
+
+class SyntheticSource(ScreenSource):
+    """An in-memory framebuffer for tests and headless benchmarks."""
+    def __init__(self, width, height, color=(0, 0, 0)):
+        self.width = width
+        self.height = height
+        self.frame = bytearray(pixel_bytes(color) * (width * height))
+        self.lock = threading.Lock()
+
+    def fill(self, x, y, width, height, color):
+        row = pixel_bytes(color) * width
+        with self.lock:
+            for r in range(y, y + height):
+                start = (r * self.width + x) * BYTES_PER_PIXEL
+                self.frame[start:start + len(row)] = row
+
+    def grab(self, x, y, width, height):
+        row_len = width * BYTES_PER_PIXEL
+        with self.lock:
+            return b"".join(
+                bytes(self.frame[(r * self.width + x) * BYTES_PER_PIXEL:(r * self.width + x) * BYTES_PER_PIXEL + row_len])
+                for r in range(y, y + height)
+            )
+
+# Packs an (r, g, b) color into one BGRX pixel.
+def pixel_bytes(color):
+    r, g, b = color
+    return bytes((b, g, r, 0))
+
+class Region:
+    """A screen rectangle split into tiles whose hashes are tracked between samples."""
+    def __init__(self, x, y, width, height, tile=DEFAULT_TILE):
+        self.x, self.y, self.width, self.height = x, y, width, height
+        self.tile = tile
+        self.tiles = [(tx, ty, min(tile, width - tx), min(tile, height - ty))
+                      for ty in range(0, height, tile) for tx in range(0, width, tile)]
+        self.data = b""
+        self.region_hash = None
+        self.tile_hashes = [None] * len(self.tiles)
+
+    def tile_bytes(self, index, data=None):
+        data = self.data if data is None else data
+        tx, ty, tw, th = self.tiles[index]
+        stride = self.width * BYTES_PER_PIXEL
+        return b"".join(data[(ty + r) * stride + tx * BYTES_PER_PIXEL:(ty + r) * stride + (tx + tw) * BYTES_PER_PIXEL]
+                        for r in range(th))
+
+    def hash_tiles(self, data):
+        return [zlib.crc32(self.tile_bytes(i, data)) for i in range(len(self.tiles))]
+
+    def sample(self, source):
+        """Grabs the region and returns the indices of tiles that changed since the last sample."""
+        data = source.grab(self.x, self.y, self.width, self.height)
+        region_hash = zlib.crc32(data)
+        if region_hash == self.region_hash:
+            return []
+        self.data = data
+        self.region_hash = region_hash
+        hashes = self.hash_tiles(data)
+        changed = [i for i, (old, new) in enumerate(zip(self.tile_hashes, hashes)) if old != new]
+        self.tile_hashes = hashes
+        return changed
+
+class Condition:
+    def __init__(self, region):
+        self.region = region
+
+    def update(self, changed, now):
+        """Re-evaluates after a sample; `changed` lists the tiles that differ."""
+        raise NotImplementedError
+
+class ColorCondition(Condition):
+    """True while any pixel in the region is within `tolerance` of `color` on every channel."""
+    def __init__(self, region, color, tolerance=0):
+        super().__init__(region)
+        self.pixel = pixel_bytes(color)
+        self.bgr = self.pixel[:3]  # The X byte is padding and may hold anything
+        self.tolerance = tolerance
+        self.tile_matches = [False] * len(region.tiles)
+        self.matched_tiles = 0
+
+    def _tile_matches(self, data):
+        if self.tolerance == 0:
+            start = data.find(self.bgr)
+            while start != -1:
+                if start % BYTES_PER_PIXEL == 0:
+                    return True
+                start = data.find(self.bgr, start + 1)
+            return False
+        b, g, r = self.pixel[0], self.pixel[1], self.pixel[2]
+        tol = self.tolerance
+        for i in range(0, len(data), BYTES_PER_PIXEL):
+            if abs(data[i] - b) <= tol and abs(data[i + 1] - g) <= tol and abs(data[i + 2] - r) <= tol:
+                return True
+        return False
+
+    def update(self, changed, now):
+        for index in changed:
+            match = self._tile_matches(self.region.tile_bytes(index))
+            if match != self.tile_matches[index]:
+                self.tile_matches[index] = match
+                self.matched_tiles += 1 if match else -1
+        return self.matched_tiles > 0
+
+class PatternCondition(Condition):
+    """True while the region is pixel-identical to `pattern` (BGRX bytes of the same size)."""
+    def __init__(self, region, pattern):
+        super().__init__(region)
+        self.pattern_hashes = region.hash_tiles(pattern)
+
+    def update(self, changed, now):
+        return self.region.tile_hashes == self.pattern_hashes
+
+class ChangeCondition(Condition):
+    """True for `hold_s` seconds after any tile of the region changes."""
+    def __init__(self, region, hold_s=0.5):
+        super().__init__(region)
+        self.hold_s = hold_s
+        self.changed_at = None
+        self.primed = False
+
+    def update(self, changed, now):
+        if changed:
+            if self.primed:
+                self.changed_at = now
+            self.primed = True  # The first sample only establishes the baseline
+        return self.changed_at is not None and now - self.changed_at <= self.hold_s
+
+class ConditionMonitor(threading.Thread):
+    """Samples every condition's region at `rate_hz` and exposes is_open() to the executor.
+
+    In "fire" mode actions run only while all conditions hold; in "pause" mode
+    they run only while they do not.
+    """
+    def __init__(self, source, conditions, mode="fire", rate_hz=30):
+        super().__init__()
+        if mode not in ("fire", "pause"):
+            raise ValueError(f"Unknown condition mode: {mode}")
+        self.source = source
+        self.conditions = conditions
+        self.mode = mode
+        self.interval = 1.0 / rate_hz
+        self.satisfied = False
+        self.samples = 0
+        self.running = False
+        self._stop_event = threading.Event()
+        self.daemon = True
+
+    def is_open(self):
+        return self.satisfied if self.mode == "fire" else not self.satisfied
+
+    def sample(self):
+        now = time.monotonic()
+        changed_by_region = {}
+        results = []
+        for condition in self.conditions:
+            region = condition.region
+            if id(region) not in changed_by_region:
+                changed_by_region[id(region)] = region.sample(self.source)
+            results.append(condition.update(changed_by_region[id(region)], now))
+        self.satisfied = all(results)
+        self.samples += 1
+
+    def run(self):
+        self.running = True
+        next_sample = time.monotonic()
+        while not self._stop_event.is_set():
+            self.sample()
+            next_sample += self.interval
+            delay = next_sample - time.monotonic()
+            if delay < 0:
+                next_sample = time.monotonic()  # Overloaded: skip missed samples
+            elif self._stop_event.wait(delay):
+                break
+        self.running = False
+
+    def stop(self):
+        self._stop_event.set()
+
+SOURCES = {'x11': X11Source}
+
+# Builds a monitor from a config dict, e.g. for headless mode:
+# {"source": "x11", "mode": "fire", "rate_hz": 60,
+#  "conditions": [{"type": "color", "region": [x, y, w, h], "color": [r, g, b], "tolerance": 10},
+#                 {"type": "change", "region": [x, y, w, h], "hold_s": 0.5}]}
+def build_condition_monitor(config, source=None):
+    if source is None:
+        source = SOURCES[config.get('source', 'x11')]()
+    regions = {}
+    conditions = []
+    for spec in config['conditions']:
+        key = tuple(spec['region']) + (spec.get('tile', DEFAULT_TILE),)
+        region = regions.get(key)
+        if region is None:
+            region = regions[key] = Region(*spec['region'], tile=spec.get('tile', DEFAULT_TILE))
+        kind = spec['type']
+        if kind == 'color':
+            conditions.append(ColorCondition(region, tuple(spec['color']), spec.get('tolerance', 0)))
+        elif kind == 'change':
+            conditions.append(ChangeCondition(region, spec.get('hold_s', 0.5)))
+        elif kind == 'pattern':
+            with open(spec['pattern_file'], "rb") as f:
+                conditions.append(PatternCondition(region, f.read()))
+        else:
+            raise ValueError(f"Unknown condition type: {kind}")
+    return ConditionMonitor(source, conditions, config.get('mode', "fire"), config.get('rate_hz', 30))
@@ -0,0 +1,28 @@
+# startup.py
+"""Phase timings for `python main.py --startup-report`.
+
+Run it after changes that touch imports or window construction; it opens the
+window, waits for the first frame to be drawn, prints how long each phase
+took and exits. For a per-module breakdown use `python -X importtime main.py`.
+"""
+import time
+
+STARTED = time.perf_counter()
+_marks = []
+
+def mark(label):
+    _marks.append((label, time.perf_counter()))
+
+def timed_import(name):
+    module = __import__(name)
+    mark(f"import {name}")
+    return module
+
+def report():
+    lines = []
+    previous = STARTED
+    for label, at in _marks:
+        lines.append(f"{label:<28} {(at - previous) * 1000:8.1f} ms")
+        previous = at
+    lines.append(f"{'time to first frame':<28} {(previous - STARTED) * 1000:8.1f} ms")
+    return "\n".join(lines)
@@ -0,0 +1,103 @@
+# text.py
+"""Types templated text one character per action.
+
+A template is plain text with placeholders, re-rendered at the start of every
+pass over it:
+    {n}          the pass number, starting at 1
+    {date}       today's date (YYYY-MM-DD)
+    {time}       the current time (HH:MM:SS)
+    {rand:A-B}   a random integer between A and B
+    {{ and }}    literal braces
+
+Each distinct character is resolved once to its key steps (press shift, press
+key, release key, release shift) and cached, so a pass is compiled with one
+dict lookup per character and typing a character is just iterating a tuple.
+"""
+import random
+import re
+import time
+
+from pynput.keyboard import Key
+
+# Characters that need Shift on a US layout; letters are handled by case
+SHIFTED_SYMBOLS = frozenset('~!@#$%^&*()_+{}|:"<>?')
+SPECIAL_KEYS = {'\n': Key.enter, '\t': Key.tab, ' ': Key.space}
+
+_PLACEHOLDER = re.compile(r"\{\{|\}\}|\{(\w+)(?::([^}]*))?\}")
+_char_steps = {}
+
+# Returns the cached ((is_press, key), ...) steps that type `char`.
+def char_steps(char):
+    steps = _char_steps.get(char)
+    if steps is None:
+        key = SPECIAL_KEYS.get(char, char)
+        if char in SHIFTED_SYMBOLS or char != char.lower():
+            steps = ((True, Key.shift), (True, key), (False, key), (False, Key.shift))
+        else:
+            steps = ((True, key), (False, key))
+        _char_steps[char] = steps
+    return steps
+
+_RANGE = re.compile(r"(-?\d+)-(-?\d+)")
+
+# Parses a {rand:A-B} argument, e.g. "1-100" or "-5-5".
+def parse_range(arg):
+    match = _RANGE.fullmatch(arg or "0-9999")
+    if match is None:
+        raise ValueError(f"Bad range in {{rand:{arg}}}: expected A-B")
+    low, high = int(match.group(1)), int(match.group(2))
+    if low > high:
+        raise ValueError(f"Bad range in {{rand:{arg}}}: {low} is above {high}")
+    return low, high
+
+# Raises ValueError for a placeholder that could only fail while typing.
+def validate_template(template):
+    for match in _PLACEHOLDER.finditer(template):
+        if match.group(1) == "rand":
+            parse_range(match.group(2))
+
+def render_template(template, n=1, rng=random):
+    def substitute(match):
+        token = match.group(0)
+        if token in ("{{", "}}"):
+            return token[0]
+        name, arg = match.group(1), match.group(2)
+        if name == "n":
+            return str(n)
+        if name == "date":
+            return time.strftime("%Y-%m-%d")
+        if name == "time":
+            return time.strftime("%H:%M:%S")
+        if name == "rand":
+            return str(rng.randint(*parse_range(arg)))
+        return token  # Unknown placeholders are typed as written
+    return _PLACEHOLDER.sub(substitute, template)
+
+class TextSource:
+    """Renders a template pass by pass and hands out one character's key steps per call."""
+    def __init__(self, template, seed=None):
+        if not template:
+            raise ValueError("Text to type must not be empty")
+        validate_template(template)
+        self.template = template
+        self.rng = random.Random(seed)
+        self.passes = 0
+        self._steps = ()
+        self._pos = 0
+
+    def _next_pass(self):
+        self.passes += 1
+        text = render_template(self.template, self.passes, self.rng)
+        self._steps = tuple(map(char_steps, text))
+        self._pos = 0
+
+    def next_steps(self):
+        if self._pos >= len(self._steps):
+            self._next_pass()
+        steps = self._steps[self._pos]
+        self._pos += 1
+        return steps
+
+def load_text(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
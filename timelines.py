@@ -0,0 +1,149 @@
+# timelines.py
+import heapq
+import itertools
+import threading
+import time
+
+from metrics import ExecutorMetrics
+from outputs import create_backend
+from program import compile_sequence
+from timing import DEFAULT_SPIN_THRESHOLD_MS, DeadlineScheduler, TimingProfile
+
+class Timeline:
+    """One independent action sequence with its own rate, driven by a TimelineScheduler."""
+    def __init__(self, name, delay_seconds, stop_count, action_sequence, click_pos=None, random_delay_ms=0,
+                 catch_up="skip", timing=None):
+        self.name = name
+        self.timing = timing if timing is not None else TimingProfile(random_delay_ms / 1000.0)
+        self.stop_count = stop_count
+        self.program = compile_sequence(action_sequence, click_pos)
+        self.scheduler = DeadlineScheduler(delay_seconds, catch_up=catch_up)
+        self.metrics = ExecutorMetrics()
+        self.actions_done = 0
+        self.active = True
+        self.steps = ()
+
+class TimelineScheduler(threading.Thread):
+    """Runs many timelines on one thread and one output backend.
+
+    Timelines sit in a heap ordered by their next deadline; ties are broken by
+    the order in which they were added, so interleaving is deterministic.
+
+    The final count of a timeline that finishes or is removed is added to
+    completed_actions on the scheduler thread, once its last action is done.
+    """
+    def __init__(self, backend=None, spin_threshold_ms=DEFAULT_SPIN_THRESHOLD_MS):
+        super().__init__()
+        self.backend = backend if backend is not None else create_backend()
+        self.spin_ns = int(spin_threshold_ms * 1_000_000)
+        self.timelines = {}
+        self.completed_actions = 0  # Actions from timelines that finished or were removed
+        self.running = False
+        self._heap = []
+        self._order = itertools.count()
+        self._wakeup = threading.Condition()
+        self._changes = 0  # Bumped under _wakeup by add/remove/stop, so a wait never misses one
+        self.daemon = True
+
+    def add(self, name, delay_seconds, stop_count, action_sequence, click_pos=None, random_delay_ms=0,
+            catch_up="skip", timing=None):
+        timeline = Timeline(name, delay_seconds, stop_count, action_sequence, click_pos, random_delay_ms, catch_up, timing)
+        timeline.steps = timeline.program.bind(self.backend)
+        with self._wakeup:
+            self.remove(name)
+            self.timelines[name] = timeline
+            timeline.scheduler.start()
+            heapq.heappush(self._heap, (timeline.scheduler.deadline_ns, next(self._order), timeline))
+            self._changes += 1
+            self._wakeup.notify()
+        return timeline
+
+    def remove(self, name):
+        """Stops a timeline; its count moves to completed_actions once any action in progress is done."""
+        with self._wakeup:
+            timeline = self.timelines.pop(name, None)
+            if timeline is not None:
+                # Removed lazily: the heap entry is dropped when it next comes due
+                timeline.active = False
+                self._changes += 1
+                self._wakeup.notify()
+        return timeline
+
+    def _drop_removed(self):
+        # Called with _wakeup held: collects removed timelines still waiting in the heap
+        kept = []
+        for entry in self._heap:
+            if entry[2].active:
+                kept.append(entry)
+            else:
+                self.completed_actions += entry[2].actions_done
+        if len(kept) != len(self._heap):
+            heapq.heapify(kept)
+            self._heap = kept
+
+    def _wait_until(self, deadline, seen):
+        """Sleeps on the condition (so add/remove can wake us), then spins the last stretch.
+
+        Returns False if the set of timelines changed since the change count
+        `seen` was read, including between the heap pop and this call.
+        """
+        remaining = deadline - time.perf_counter_ns() - self.spin_ns
+        if remaining > 0:
+            with self._wakeup:
+                if self._wakeup.wait_for(lambda: self._changes != seen, remaining / 1_000_000_000):
+                    return False
+        while time.perf_counter_ns() < deadline:
+            pass
+        return True
+
+    def run(self):
+        self.running = True
+        flush = self.backend.flush
+        clock = time.perf_counter_ns
+        while self.running:
+            with self._wakeup:
+                while self.running and not self._heap:
+                    self._wakeup.wait()
+                if not self.running:
+                    break
+                entry = heapq.heappop(self._heap)
+                seen = self._changes
+                deadline, _, timeline = entry
+                if not timeline.active:
+                    self.completed_actions += timeline.actions_done
+                    continue
+
+            if not self._wait_until(deadline, seen):
+                # Something changed; put the entry back and pick the earliest again
+                with self._wakeup:
+                    heapq.heappush(self._heap, entry)
+                    self._drop_removed()
+                continue
+
+            started = clock()
+            for action, arg in timeline.steps:
+                action(arg)
+            flush()
+            timeline.metrics.record_action(started, clock())
+            timeline.actions_done += 1
+
+            finished = timeline.stop_count > 0 and timeline.actions_done >= timeline.stop_count
+            if not finished:
+                timeline.scheduler.advance(timeline.timing.next_ns())
+                timeline.metrics.missed_deadlines = timeline.scheduler.missed
+            with self._wakeup:
+                if finished and self.timelines.get(timeline.name) is timeline:
+                    del self.timelines[timeline.name]
+                    timeline.active = False
+                if timeline.active:
+                    heapq.heappush(self._heap, (timeline.scheduler.deadline_ns, next(self._order), timeline))
+                else:
+                    # Finished, or removed while this action ran: the count is final only now
+                    self.completed_actions += timeline.actions_done
+        self.running = False
+
+    def stop(self):
+        with self._wakeup:
+            self.running = False
+            self._changes += 1
+            self._wakeup.notify()
@@ -0,0 +1,193 @@
+# timing.py
+import math
+import random
+import time
+from array import array
+
+_numpy = None  # Imported (if installed) when the first profile or executor is set up, not at startup
+
+# Imports NumPy once, or records that it is missing; never call it from inside a timed loop.
+def load_numpy():
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy
+
+PRECISION_MODES = ("sleep", "hybrid", "spin")
+CATCH_UP_POLICIES = ("skip", "burst", "stretch")
+DISTRIBUTIONS = ("uniform", "gaussian", "lognormal", "human")
+LOGNORMAL_SIGMA = 0.5
+# Hybrid waits sleep until this close to the deadline, then spin. Sleep overshoot
+# can exceed it (bench.py on a VM: p99 jitter at 10 CPS rose from 0.006 ms at 2 ms
+# to ~5 ms at 0.5 ms), but spinning 2 ms before every action cost ~4x the CPU.
+# Raise it through spin_threshold_ms where timing matters more than CPU.
+DEFAULT_SPIN_THRESHOLD_MS = 0.5
+
+class DeadlineScheduler:
+    """Paces a loop against absolute perf_counter_ns deadlines.
+
+    Each deadline is derived from a fixed grid (start + n * period), so the time
+    spent doing the work and any sleep overshoot never accumulate into drift.
+    """
+    def __init__(self, period_s, precision="hybrid", catch_up="skip", spin_threshold_ms=DEFAULT_SPIN_THRESHOLD_MS):
+        if precision not in PRECISION_MODES:
+            raise ValueError(f"Unknown precision mode: {precision}")
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError(f"Unknown catch-up policy: {catch_up}")
+        self.period_ns = max(0, int(period_s * 1_000_000_000))
+        self.precision = precision
+        self.catch_up = catch_up
+        self.spin_ns = int(spin_threshold_ms * 1_000_000)
+        self.grid_ns = 0
+        self.deadline_ns = 0
+        self.due_ns = 0  # The latest deadline handed out so far, offsets included
+        self.missed = 0
+
+    def start(self):
+        # The first action fires immediately, like the old sleep-after loop.
+        self.grid_ns = time.perf_counter_ns()
+        self.deadline_ns = self.due_ns = self.grid_ns
+        self.missed = 0
+
+    def advance(self, offset_ns=0):
+        """Moves to the next grid slot, applying the catch-up policy if it was already missed.
+
+        A slot only counts as missed when the loop is a full period behind the
+        latest deadline it was given. An earlier action pushed past this slot by
+        its own positive offset is on time, so random offsets wider than the
+        period do not lower the rate.
+        """
+        self.grid_ns += self.period_ns
+        now = time.perf_counter_ns()
+        lateness = now - max(self.due_ns + self.period_ns, self.grid_ns + offset_ns)
+        if lateness > 0 and self.period_ns > 0:
+            self.missed += 1
+            if self.catch_up == "skip":
+                # Drop the slots that passed entirely and fire the current one late.
+                skipped = lateness // self.period_ns
+                self.missed += skipped
+                self.grid_ns += skipped * self.period_ns
+            elif self.catch_up == "stretch":
+                # Shift the whole schedule so the late slot becomes the new origin.
+                self.grid_ns = now
+            # "burst" keeps the grid and fires missed slots back-to-back.
+        self.deadline_ns = self.grid_ns + offset_ns
+        if self.deadline_ns > self.due_ns:
+            self.due_ns = self.deadline_ns
+
+    def set_period(self, period_s):
+        """Changes the rate mid-run; the next slot is one new period after the last one fired."""
+        period_ns = max(0, int(period_s * 1_000_000_000))
+        self.grid_ns += period_ns - self.period_ns
+        self.deadline_ns += period_ns - self.period_ns
+        self.due_ns += period_ns - self.period_ns
+        self.period_ns = period_ns
+
+    def wait(self, interrupt=None):
+        """Blocks until the current deadline using the configured precision mode.
+
+        If `interrupt` (a threading.Event) is set while waiting, returns False early.
+        """
+        deadline = self.deadline_ns
+        if self.precision != "spin":
+            # Coarse sleep until close to the deadline ("hybrid"), or all the way ("sleep").
+            spin_ns = self.spin_ns if self.precision == "hybrid" else 0
+            remaining = deadline - time.perf_counter_ns() - spin_ns
+            if remaining > 0:
+                if interrupt is None:
+                    time.sleep(remaining / 1_000_000_000)
+                elif interrupt.wait(remaining / 1_000_000_000):
+                    return False
+            if self.precision == "sleep":
+                return True
+        if interrupt is None:
+            while time.perf_counter_ns() < deadline:
+                pass
+        else:
+            while time.perf_counter_ns() < deadline:
+                if interrupt.is_set():
+                    return False
+        return True
+
+class TimingProfile:
+    """Zero-mean random offsets (in ns) for each action's deadline, generated in blocks.
+
+    Offsets are applied around DeadlineScheduler's fixed grid, so however they
+    are distributed they never shift the mean rate. A block of BLOCK_SIZE offsets
+    is generated at once (with NumPy when it is installed) into an array('q') and
+    refilled only when exhausted, outside the action injection itself. NumPy is
+    imported when a profile is created, so the first refill mid-run never pays for it.
+
+    - uniform:   evenly spread over +/- spread
+    - gaussian:  normal with sigma = spread / 2
+    - lognormal: right-skewed (occasional long pauses), shifted to mean zero, never below -spread
+    - human:     resampled from recorded intervals (`samples`, in seconds) around their mean
+    """
+    BLOCK_SIZE = 1024
+
+    def __init__(self, spread_s, distribution="uniform", seed=None, samples=None):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown timing distribution: {distribution}")
+        if distribution == "human" and not samples:
+            raise ValueError("The human distribution needs recorded interval samples")
+        self.spread_ns = spread_s * 1_000_000_000
+        self.distribution = distribution
+        self.seed = seed
+        if distribution == "human":
+            mean = sum(samples) / len(samples)
+            self.samples = [(s - mean) * 1_000_000_000 for s in samples]
+        else:
+            self.samples = None
+        self._rng = None
+        self._block = array('q')
+        self._pos = 0
+        self.enabled = distribution == "human" or self.spread_ns > 0
+        if self.enabled:
+            load_numpy()
+
+    def next_ns(self):
+        if not self.enabled:
+            return 0
+        if self._pos >= len(self._block):
+            self._refill()
+        value = self._block[self._pos]
+        self._pos += 1
+        return value
+
+    def _refill(self):
+        n = self.BLOCK_SIZE
+        spread = self.spread_ns
+        np = load_numpy()
+        if self._rng is None:
+            self._rng = np.random.default_rng(self.seed) if np else random.Random(self.seed)
+        if np:
+            rng = self._rng
+            if self.distribution == "uniform":
+                values = rng.uniform(-spread, spread, n)
+            elif self.distribution == "gaussian":
+                values = rng.normal(0.0, spread / 2, n)
+            elif self.distribution == "lognormal":
+                scale = math.exp(LOGNORMAL_SIGMA ** 2 / 2)
+                values = spread * (rng.lognormal(0.0, LOGNORMAL_SIGMA, n) / scale - 1)
+            else:
+                values = rng.choice(np.asarray(self.samples), n)
+            block = array('q')
+            block.frombytes(values.astype(np.int64).tobytes())
+        else:
+            rng = self._rng
+            if self.distribution == "uniform":
+                values = [rng.uniform(-spread, spread) for _ in range(n)]
+            elif self.distribution == "gaussian":
+                values = [rng.gauss(0.0, spread / 2) for _ in range(n)]
+            elif self.distribution == "lognormal":
+                scale = math.exp(LOGNORMAL_SIGMA ** 2 / 2)
+                values = [spread * (rng.lognormvariate(0.0, LOGNORMAL_SIGMA) / scale - 1) for _ in range(n)]
+            else:
+                values = rng.choices(self.samples, k=n)
+            block = array('q', map(int, values))
+        self._block = block
+        self._pos = 0
@@ -1,6 +1,9 @@
 # utils.py
 import time
-from pynput.keyboard import Key
+from pynput.keyboard import Key, KeyCode
+from pynput.mouse import Button
+
+from program import compile_sequence, OP_CLICK, OP_TYPE
 
 # Formats a pynput key object into a readable string like 'Ctrl' or 'A'.
 def format_key(key):
@@ -17,13 +20,18 @@ def format_action_sequence(sequence):
     if isinstance(sequence, set):
         return " + ".join(sorted([format_key(k) for k in sequence]))
 
-    # Handle the old action format (a list of dicts)
-    if len(sequence) == 1 and sequence[0]['type'] == 'click':
-        return f"Click: {format_key(sequence[0]['button'])}"
+    # Handle the action format (a list of dicts or an already compiled Program)
+    actions = compile_sequence(sequence).actions
+    if len(actions) == 1 and actions[0].code == OP_CLICK:
+        return f"Click: {format_key(actions[0].arg)}"
+    if len(actions) == 1 and actions[0].code == OP_TYPE:
+        template = actions[0].arg.template
+        return f"Type: {template[:12]}..." if len(template) > 12 else f"Type: {template}"
 
     # Keyboard action
-    modifiers = [format_key(e['key']) for e in sequence if isinstance(e.get('key'), Key) and 'shift' in e['key'].name]
-    main_key = [format_key(e['key']) for e in sequence if 'key' in e and not isinstance(e.get('key'), Key) or (isinstance(e.get('key'), Key) and 'shift' not in e['key'].name)]
+    keys = [op.arg for op in actions if op.code != OP_CLICK]
+    modifiers = [format_key(k) for k in keys if isinstance(k, Key) and 'shift' in k.name]
+    main_key = [format_key(k) for k in keys if not isinstance(k, Key) or 'shift' not in k.name]
     
     parts = sorted(list(set(modifiers)))
     if main_key:
@@ -31,6 +39,54 @@ def format_action_sequence(sequence):
 
     return " + ".join(parts) if parts else "Unknown Key"
 
+# Converts a pynput Key, KeyCode or Button into a string that survives a JSON round trip.
+def serialize_key(key):
+    if isinstance(key, Key):
+        return f"Key.{key.name}"
+    if isinstance(key, Button):
+        return f"Button.{key.name}"
+    if isinstance(key, KeyCode):
+        return f"char:{key.char}" if key.char is not None else f"vk:{key.vk}"
+    return f"char:{key}"
+
+# Inverse of serialize_key.
+def deserialize_key(text):
+    kind, _, value = text.partition(".") if text.startswith(("Key.", "Button.")) else text.partition(":")
+    if kind == "Key":
+        return Key[value]
+    if kind == "Button":
+        return Button[value]
+    if kind == "vk":
+        return KeyCode.from_vk(int(value))
+    if kind == "char":
+        return KeyCode.from_char(value)
+    raise ValueError(f"Cannot deserialize key: {text}")
+
+# Converts an action sequence (list of event dicts) into JSON-friendly dicts.
+def serialize_sequence(sequence):
+    result = []
+    for event in sequence:
+        item = dict(event)
+        for field in ('key', 'button'):
+            if field in item:
+                item[field] = serialize_key(item[field])
+        if 'pos' in item:
+            item['pos'] = list(item['pos'])
+        result.append(item)
+    return result
+
+def deserialize_sequence(data):
+    result = []
+    for item in data:
+        event = dict(item)
+        for field in ('key', 'button'):
+            if field in event:
+                event[field] = deserialize_key(event[field])
+        if 'pos' in event:
+            event['pos'] = tuple(event['pos'])
+        result.append(event)
+    return result
+
 def format_time(seconds):
     """Formats seconds into HH:MM:SS format."""
     m, s = divmod(seconds, 60)